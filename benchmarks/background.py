@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Resident memory of GTKetchup with its window open versus in background mode.
+
+Starts the app with a running timer, reads VmRSS from /proc once the window
+is up, sends the "background" action (which closes the window while the
+timer keeps running), reads it again, then re-activates the app to show the
+cost of rebuilding the window. Runs inside a private session bus through
+dbus-run-session when available. Needs a display and `gapplication`.
+
+    python3 benchmarks/background.py --settle 3
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_ID = "com.github.geraldohomero.GTKetchup"
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("no VmRSS for pid %d" % pid)
+
+
+def measure(settle):
+    main = os.path.join(ROOT, "main.py")
+    proc = subprocess.Popen([sys.executable, main, "--set-time", "30:00", "--start"])
+    try:
+        time.sleep(settle)
+        if proc.poll() is not None:
+            raise RuntimeError("GTKetchup exited early (is a display available?)")
+        results = [("window", rss_kb(proc.pid))]
+
+        subprocess.run(["gapplication", "action", APP_ID, "background"], check=True)
+        time.sleep(settle)
+        if proc.poll() is not None:
+            raise RuntimeError("GTKetchup exited instead of staying in the background")
+        results.append(("background", rss_kb(proc.pid)))
+
+        subprocess.run([sys.executable, main], check=True)
+        time.sleep(settle)
+        results.append(("window rebuilt", rss_kb(proc.pid)))
+        return results
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--settle", type=float, default=3.0,
+                        help="seconds to wait after each step")
+    parser.add_argument("--inner", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not args.inner and shutil.which("dbus-run-session"):
+        # Re-run inside a private bus so a running instance is not reused
+        cmd = ["dbus-run-session", "--", sys.executable, os.path.abspath(__file__),
+               "--inner", "--settle", str(args.settle)]
+        sys.exit(subprocess.call(cmd))
+
+    results = measure(args.settle)
+    windowed = results[0][1]
+    print(f"{'mode':<16} {'RSS MiB':>8} {'of windowed':>12}")
+    for label, rss in results:
+        print(f"{label:<16} {rss / 1024:>8.1f} {rss / windowed:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
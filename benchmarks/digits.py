@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Countdown text: digit atlas compositing versus Pango layouts.
+
+Paints the digits layer (what a one-second tick redraws) into an image
+surface at 1x and 2x device scale, with a new time every frame, once
+through the DigitAtlas and once through the Pango layout path, and
+reports mean/p95 frame times. Needs a display for GTK (or e.g. xvfb-run).
+
+    python3 benchmarks/digits.py --frames 500
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gi
+
+gi.require_version('Gtk', '4.0')
+
+from gi.repository import Gtk
+import cairo
+
+from config import ConfigStore
+from pomodoro import PomodoroTimer
+from timer_core import ManualClock, TimerCore
+
+VIEWS = [
+    ("MM SS", 25 * 60),
+    ("HH:MM :SS", 90 * 60),
+]
+
+
+def run(timer, start_seconds, size, scale, frames):
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, size * scale, size * scale)
+    surface.set_device_scale(scale, scale)
+    # The dial takes its scale from the widget, like in a real window, and
+    # an unrealized widget reports 1
+    timer.get_scale_factor = lambda: scale
+    # Warm up: the atlas (or layout) is built on the first frame
+    timer._shown_seconds = start_seconds
+    timer._draw_digits(cairo.Context(surface), size, size)
+    times = []
+    for i in range(frames):
+        timer._shown_seconds = start_seconds - i % 600
+        cr = cairo.Context(surface)
+        cr.set_operator(cairo.OPERATOR_CLEAR)
+        cr.paint()
+        cr.set_operator(cairo.OPERATOR_OVER)
+        start = time.perf_counter()
+        timer._draw_digits(cr, size, size)
+        surface.flush()
+        times.append((time.perf_counter() - start) * 1000)
+    return sorted(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", type=int, default=400)
+    args = parser.parse_args()
+
+    Gtk.init()
+    timer = PomodoroTimer(ConfigStore(), TimerCore(25 * 60, clock=ManualClock()))
+
+    print(f"{'view':<10} {'scale':>5} {'path':>6} {'mean ms':>8} {'p95 ms':>8}")
+    for label, seconds in VIEWS:
+        for scale in (1, 2):
+            for atlas in (True, False):
+                timer.use_digit_atlas = atlas
+                times = run(timer, seconds, args.size, scale, args.frames)
+                p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+                print(f"{label:<10} {scale:>4}x {'atlas' if atlas else 'pango':>6} "
+                      f"{statistics.mean(times):>8.3f} {p95:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Startup time and memory of `main.py --headless` versus the GUI.
+
+Launches each path several times with a running 30 minute timer and
+measures the time from spawn until it is up (the first status line for
+--headless, the --profile-startup report after the first frame for the GUI)
+and the resident memory at that point. The GUI runs need a display and use
+a private session bus through dbus-run-session when available; the headless
+runs need neither.
+
+    python3 benchmarks/headless.py --runs 5
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("no VmRSS for pid %d" % pid)
+
+
+def run_once(headless, timeout, data_dir):
+    main = os.path.join(ROOT, "main.py")
+    if headless:
+        cmd = [sys.executable, main, "--headless", "--set-time", "30:00"]
+        ready = lambda line: line.startswith("{")
+    else:
+        cmd = [sys.executable, main, "--profile-startup", "--set-time", "30:00", "--start"]
+        ready = lambda line: line.strip().startswith("total")
+        if shutil.which("dbus-run-session"):
+            cmd = ["dbus-run-session", "--"] + cmd
+
+    started = time.perf_counter()
+    # Keep the interrupted sessions out of the real history
+    env = dict(os.environ, XDG_DATA_HOME=data_dir)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, env=env)
+    try:
+        for line in proc.stdout:
+            if ready(line):
+                break
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError("timed out waiting for startup")
+        else:
+            raise RuntimeError("exited before starting up (is a display available?)")
+        elapsed = (time.perf_counter() - started) * 1000
+        # dbus-run-session forks the app; measure the app itself
+        pid = proc.pid
+        if not headless and cmd[0] == "dbus-run-session":
+            children = subprocess.run(["pgrep", "-P", str(proc.pid), "-f", "main.py"], capture_output=True, text=True).stdout.split()
+            pid = int(children[-1]) if children else pid
+        return elapsed, rss_kb(pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--skip-gui", action="store_true", help="only measure --headless")
+    args = parser.parse_args()
+
+    paths = [("headless", True)] if args.skip_gui else [("headless", True), ("gui", False)]
+    print(f"{'path':<10} {'start mean ms':>14} {'start min ms':>13} {'RSS MiB':>8}")
+    for label, headless in paths:
+        with tempfile.TemporaryDirectory() as data_dir:
+            runs = [run_once(headless, args.timeout, data_dir) for _ in range(args.runs)]
+        times = [elapsed for elapsed, _ in runs]
+        rss = statistics.mean(kb for _, kb in runs) / 1024
+        print(f"{label:<10} {statistics.mean(times):>14.1f} {min(times):>13.1f} {rss:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Main loop wakeups of a running timer over a simulated hour.
+
+Drives a one-hour TimerCore on ManualClock, once visible (ticking every
+second), once hidden the whole time and once hidden for the middle of the
+hour, and checks that hidden timers only wake up for their deadline and
+the once-a-minute resume check, that they still finish exactly on time
+and that showing them again resyncs the displayed time. Exits non-zero
+when a check fails. Needs no gi.
+
+    python3 benchmarks/hidden_wakeups.py
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timer_core import RESUME_CHECK_US, USEC_PER_SEC, ManualClock, TimerCore
+
+HOUR = 3600
+RESUME_CHECKS = HOUR * USEC_PER_SEC // RESUME_CHECK_US
+
+
+def run(hidden_from, hidden_until):
+    # Returns (wakeups, finish time, seconds shown right after re-showing)
+    clock = ManualClock()
+    core = TimerCore(HOUR, clock=clock)
+    finished = []
+    core.connect("finished", lambda c: finished.append(clock.monotonic_time()))
+    core.start()
+    resynced = None
+    if hidden_from is not None:
+        clock.advance(hidden_from)
+        core.set_ticking(False)
+        clock.advance(hidden_until - hidden_from)
+        core.set_ticking(True)
+        resynced = core.time_seconds
+    clock.advance(HOUR + 1 - clock.monotonic_time() / USEC_PER_SEC)
+    return clock.wakeups, finished, resynced, clock.pending_sources()
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__.splitlines()[0]).parse_args()
+
+    failures = []
+
+    def check(label, ok):
+        print(f"{'ok' if ok else 'FAIL':<5} {label}")
+        if not ok:
+            failures.append(label)
+
+    scenarios = [
+        ("visible", None, None),
+        ("hidden", 0, HOUR + 1),
+        ("hidden 10:00-50:00", 600, 3000),
+    ]
+    print(f"{'scenario':<20} {'wakeups':>8}")
+    results = {}
+    for label, start, end in scenarios:
+        results[label] = run(start, end)
+        print(f"{label:<20} {results[label][0]:>8}")
+
+    wakeups, finished, _, pending = results["visible"]
+    check("visible timer wakes once per second", HOUR - 1 <= wakeups <= HOUR + 1)
+    check("visible timer finishes on its deadline", finished == [HOUR * USEC_PER_SEC + 1000])
+
+    wakeups, finished, _, pending = results["hidden"]
+    check("hidden timer wakes only for its deadline and resume checks", wakeups <= RESUME_CHECKS + 1)
+    check("hidden timer finishes on its deadline", finished == [HOUR * USEC_PER_SEC + 1000])
+    check("no sources left after finishing", pending == 0)
+
+    wakeups, finished, resynced, pending = results["hidden 10:00-50:00"]
+    check("hidden span costs only resume checks", wakeups <= HOUR - 2400 + 2 + RESUME_CHECKS)
+    check("display resyncs when shown again", resynced == HOUR - 3000)
+    check("partly hidden timer finishes on its deadline", finished == [HOUR * USEC_PER_SEC + 1000])
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Cost of the session history with years of records.
+
+Writes a synthetic log of N records (default 1M, about 27 years of ~100
+sessions a day) to a temporary directory and times a full rescan against
+what the app actually does at startup (index load plus a tail scan), and
+the statistics queries. Needs PyGObject but no display.
+
+    python3 benchmarks/history.py --records 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import FINISHED, PAUSED, RECORD, HistoryStats, pack_record
+
+
+def timed(label, func, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    print(f"{label:<32} {(time.perf_counter() - start) * 1000 / repeat:>10.3f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000000)
+    parser.add_argument("--tail", type=int, default=100,
+                        help="records missing from the index, as after a crash")
+    args = parser.parse_args()
+
+    now = int(time.time())
+    # Spread sessions back in time, roughly 14 minutes apart
+    records = [(now - i * 850, 1500, 1500 if i % 4 else 700, FINISHED if i % 4 else PAUSED)
+               for i in range(args.records, 0, -1)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "history.bin")
+        data = timed("pack records", lambda: b"".join(pack_record(*r) for r in records))
+        with open(log_path, "wb") as f:
+            f.write(data)
+        print(f"{'log size':<32} {os.path.getsize(log_path) / 1e6:>10.1f} MB")
+
+        def rescan():
+            stats = HistoryStats()
+            with open(log_path, "rb") as f:
+                stats.add_bytes(f.read())
+            return stats
+
+        full = timed("full rescan", rescan)
+
+        head = HistoryStats()
+        head.add_bytes(data[:-args.tail * RECORD.size])
+        index_text = head.to_json()
+        print(f"{'index size':<32} {len(index_text) / 1e3:>10.1f} kB")
+
+        def incremental():
+            stats = HistoryStats.from_json(index_text)
+            with open(log_path, "rb") as f:
+                f.seek(stats.records * RECORD.size)
+                stats.add_bytes(f.read())
+            return stats
+
+        stats = timed("index load + tail scan", incremental, repeat=10)
+        assert stats.records == full.records and stats.days == full.days
+
+        timed("today + week", lambda: (stats.today(), stats.week()), repeat=1000)
+        timed("current streak", stats.current_streak, repeat=1000)
+        timed("longest streak", stats.longest_streak, repeat=100)
+        timed("append one record", lambda: stats.add(now, 1500, 1500, FINISHED), repeat=10000)
+
+
+if __name__ == "__main__":
+    main()
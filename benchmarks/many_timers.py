@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Idle cost of many concurrent timers on a real GLib main loop.
+
+Runs N TimerCores for a few seconds, once with every timer on the shared
+TickScheduler (what the window uses) and once with one scheduler per timer
+(the old one-source-per-timer behaviour), and reports process CPU time,
+main loop wakeups and memory per timer. Needs PyGObject but no display.
+
+    python3 benchmarks/many_timers.py --timers 100 500 1000 --seconds 5
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gi.repository import GLib
+
+from timer_core import GLibClock, TickScheduler, TimerCore
+
+
+def run(count, seconds, shared):
+    clock = GLibClock()
+    scheduler = TickScheduler(clock) if shared else None
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    timers = [TimerCore(3600 + i, scheduler=scheduler or TickScheduler(clock)) for i in range(count)]
+    changes = [0]
+    for timer in timers:
+        timer.connect("changed", lambda core: changes.__setitem__(0, changes[0] + 1))
+        timer.start()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    memory = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    loop = GLib.MainLoop()
+    GLib.timeout_add(int(seconds * 1000), loop.quit)
+    cpu_start = time.process_time()
+    loop.run()
+    cpu = time.process_time() - cpu_start
+
+    schedulers = {timer.scheduler for timer in timers}
+    wakeups = sum(s.wakeups for s in schedulers)
+    for timer in timers:
+        timer.pause()
+    return cpu, wakeups, changes[0], memory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timers", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'timers':>7} {'mode':>10} {'CPU ms/s':>9} {'wakeups/s':>10} {'changes/s':>10} {'bytes/timer':>12}")
+    for count in args.timers:
+        for shared in (True, False):
+            cpu, wakeups, changes, memory = run(count, args.seconds, shared)
+            mode = "shared" if shared else "per-timer"
+            print(f"{count:>7} {mode:>10} {cpu * 1000 / args.seconds:>9.2f} "
+                  f"{wakeups / args.seconds:>10.1f} {changes / args.seconds:>10.1f} {memory / count:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Offscreen render benchmark for PomodoroTimer.
+
+Renders the dial into a cairo.ImageSurface for each interesting state and
+size and reports mean/p95/p99 frame times plus Python allocations per frame
+(tracemalloc, measured in a separate pass so it does not skew the timings).
+
+"full" is PomodoroTimer.on_draw(), a repaint of every layer; "tick" only
+paints the digits layer, which is what a normal one-second tick redraws.
+Needs a display for GTK (or e.g. xvfb-run). For real on-screen frame times,
+run the app with GTKETCHUP_FRAME_LOG=1 instead.
+
+    python3 benchmarks/render.py --frames 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gi
+
+gi.require_version('Gtk', '4.0')
+
+from gi.repository import Gtk
+import cairo
+
+from config import ConfigStore
+from pomodoro import PomodoroTimer
+from timer_core import ManualClock, TimerCore
+
+STATES = [
+    ("25:00 paused", 25 * 60, False),
+    ("25:00 running", 25 * 60, True),
+    ("1h30 hours view", 90 * 60, False),
+    ("1h30 running", 90 * 60, True),
+    ("100 min", 100 * 60, False),
+    ("999 min", 999 * 60, True),
+]
+SIZES = [400, 800, 1440, 2160]
+
+
+def make_timer(seconds, running):
+    core = TimerCore(seconds, clock=ManualClock())
+    timer = PomodoroTimer(ConfigStore(), core)
+    if running:
+        core.start()
+        core.clock.advance(0.5)
+    return timer
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def render_frames(timer, size, frames, painter):
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, size, size)
+    times = []
+    for _ in range(frames):
+        cr = cairo.Context(surface)
+        cr.set_operator(cairo.OPERATOR_CLEAR)
+        cr.paint()
+        cr.set_operator(cairo.OPERATOR_OVER)
+        start = time.perf_counter()
+        painter(cr, size)
+        surface.flush()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def allocations_per_frame(timer, size, frames, painter):
+    render_frames(timer, size, 2, painter)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    render_frames(timer, size, frames, painter)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return blocks / frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    args = parser.parse_args()
+
+    Gtk.init()
+
+    painters = {
+        "full": lambda timer: lambda cr, size: timer.on_draw(None, cr, size, size),
+        "tick": lambda timer: lambda cr, size: timer._draw_digits(cr, size, size),
+    }
+
+    print(f"{'state':<18} {'size':>5} {'mode':>5} {'mean ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'allocs/frame':>13}")
+    for label, seconds, running in STATES:
+        for size in args.sizes:
+            for mode, make_painter in painters.items():
+                timer = make_timer(seconds, running)
+                painter = make_painter(timer)
+                # Warm caches first; steady-state frames are what matter
+                render_frames(timer, size, 3, painter)
+                times = sorted(render_frames(timer, size, args.frames, painter))
+                allocs = allocations_per_frame(timer, size, min(args.frames, 50), painter)
+                print(f"{label:<18} {size:>5} {mode:>5} {statistics.mean(times):>8.3f} "
+                      f"{percentile(times, 0.95):>8.3f} {percentile(times, 0.99):>8.3f} {allocs:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""CPU cost per frame of the cairo and GSK (do_snapshot) dial renderers.
+
+"cairo" is PomodoroTimer.on_draw() into an image surface, which is what
+the DrawingArea layers rasterize. "gsk" builds the node tree with
+snapshot_dial() and renders it with Gsk.CairoRenderer, the software GSK
+renderer, so the numbers are comparable and need no GPU; with GL or Vulkan
+the rasterization part moves off the CPU. "tick" frames only repaint the
+digits layer. Needs a display for GTK (or e.g. xvfb-run).
+
+    python3 benchmarks/snapshot.py --frames 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gi
+
+gi.require_version('Gtk', '4.0')
+gi.require_version('Gsk', '4.0')
+gi.require_version('Graphene', '1.0')
+
+from gi.repository import Gdk, Graphene, Gsk, Gtk
+import cairo
+
+from render import STATES, make_timer
+
+
+def make_renderer():
+    renderer = Gsk.CairoRenderer.new()
+    if hasattr(renderer, "realize_for_display"):
+        renderer.realize_for_display(Gdk.Display.get_default())
+    else:
+        renderer.realize(None)
+    return renderer
+
+
+def cairo_frame(timer, size, tick):
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, size, size)
+    cr = cairo.Context(surface)
+    if tick:
+        timer._draw_digits(cr, size, size)
+    else:
+        timer.on_draw(None, cr, size, size)
+    surface.flush()
+
+
+def gsk_frame(timer, size, tick, renderer):
+    snapshot = Gtk.Snapshot()
+    if tick:
+        timer._snapshot_digits(snapshot, size, size)
+    else:
+        timer.snapshot_dial(snapshot, size, size)
+    node = snapshot.to_node()
+    if node is not None:
+        renderer.render_texture(node, Graphene.Rect().init(0, 0, size, size))
+
+
+def measure(frame, frames):
+    frame()
+    times = []
+    for _ in range(frames):
+        start = time.process_time()
+        frame()
+        times.append((time.process_time() - start) * 1000)
+    return statistics.mean(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[400, 1440])
+    args = parser.parse_args()
+
+    Gtk.init()
+    renderer = make_renderer()
+
+    print(f"{'state':<18} {'size':>5} {'frame':>5} {'cairo CPU ms':>13} {'gsk CPU ms':>11}")
+    for label, seconds, running in STATES:
+        for size in args.sizes:
+            for tick in (False, True):
+                timer = make_timer(seconds, running)
+                cairo_ms = measure(lambda: cairo_frame(timer, size, tick), args.frames)
+                gsk_ms = measure(lambda: gsk_frame(timer, size, tick, renderer), args.frames)
+                print(f"{label:<18} {size:>5} {'tick' if tick else 'full':>5} {cairo_ms:>13.3f} {gsk_ms:>11.3f}")
+    renderer.unrealize()
+
+
+if __name__ == "__main__":
+    main()
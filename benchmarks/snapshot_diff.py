@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Pixel comparison of the cairo and GSK (do_snapshot) dial renderers.
+
+Renders every state of benchmarks/render.py offscreen twice, once with
+PomodoroTimer.on_draw() and once by drawing the node tree built by
+snapshot_dial() with RenderNode.draw(), and counts the pixels whose
+channels differ by more than --tolerance. Antialiasing of circles and
+glyph placement differ slightly between the two, so a small share of edge
+pixels is expected. Exits non-zero when any state exceeds --max-share.
+Needs a display for GTK (or e.g. xvfb-run).
+
+    python3 benchmarks/snapshot_diff.py --size 400
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gi
+
+gi.require_version('Gtk', '4.0')
+
+from gi.repository import Gtk
+import cairo
+
+from render import STATES, make_timer
+
+
+def render(paint, size):
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, size, size)
+    paint(cairo.Context(surface))
+    surface.flush()
+    return bytes(surface.get_data())
+
+
+def compare(a, b, tolerance):
+    differing = 0
+    max_diff = 0
+    for i in range(0, len(a), 4):
+        diff = max(abs(a[i + c] - b[i + c]) for c in range(4))
+        max_diff = max(max_diff, diff)
+        if diff > tolerance:
+            differing += 1
+    return differing / (len(a) // 4), max_diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=400)
+    parser.add_argument("--tolerance", type=int, default=48)
+    parser.add_argument("--max-share", type=float, default=0.01,
+                        help="largest allowed share of differing pixels")
+    args = parser.parse_args()
+
+    Gtk.init()
+    failures = 0
+    print(f"{'state':<18} {'differing':>10} {'max diff':>9}")
+    for label, seconds, running in STATES:
+        timer = make_timer(seconds, running)
+        size = args.size
+        reference = render(lambda cr: timer.on_draw(None, cr, size, size), size)
+
+        def paint_nodes(cr):
+            snapshot = Gtk.Snapshot()
+            timer.snapshot_dial(snapshot, size, size)
+            node = snapshot.to_node()
+            if node is not None:
+                node.draw(cr)
+
+        share, max_diff = compare(reference, render(paint_nodes, size), args.tolerance)
+        ok = share <= args.max_share
+        failures += not ok
+        print(f"{label:<18} {share:>9.2%} {max_diff:>9} {'' if ok else 'FAIL'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
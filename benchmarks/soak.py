@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""24 hour soak of many timers on a simulated clock.
+
+Runs N timers (default 200) on one shared TickScheduler and a ManualClock
+for a simulated day: half of them chain Pomodoro cycles, the rest are
+restarted, paused and adjusted at random (seeded) moments, and only a
+third are "on screen" (ticking). Reports CPU time and wakeups per simulated
+hour and the growth of allocated memory blocks, and fails on leaks: more
+than one clock source armed at a time, sources or scheduled timers left
+after everything stopped, or allocated blocks growing past --max-growth.
+
+With --subprocesses (needs PyGObject), every finished timer also goes
+through FinishNotifier's spawn-and-reap path with `true` standing in for
+notify-send/paplay, and the run fails if any child is still unreaped after
+the main loop had a chance to collect it.
+
+    python3 benchmarks/soak.py --timers 200 --hours 24
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cycle import DictConfig, PomodoroCycle
+from timer_core import ManualClock, TickScheduler, TimerCore
+
+CONFIG = DictConfig({
+    "default_time": 25,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "cycle_enabled": True,
+})
+LENGTHS = [60, 5 * 60, 25 * 60, 50 * 60, 90 * 60]
+# Seconds of simulated time between checks and user actions
+STEP = 60
+REAP_TIMEOUT = 5.0
+
+
+class Soak:
+    def __init__(self, count, seed, notifier=None):
+        self.rng = random.Random(seed)
+        self.clock = ManualClock()
+        self.scheduler = TickScheduler(self.clock)
+        self.notifier = notifier
+        self.finished = 0
+        self.cores = []
+        self.cycles = []
+        for i in range(count):
+            core = TimerCore(self.rng.choice(LENGTHS), scheduler=self.scheduler)
+            core.set_ticking(i % 3 == 0)
+            core.connect("finished", self.on_finished)
+            if i % 2:
+                self.cycles.append(PomodoroCycle(core, CONFIG))
+            self.cores.append(core)
+            core.start()
+            self.clock.advance(self.rng.random())
+
+    def on_finished(self, core):
+        self.finished += 1
+        if self.notifier is not None:
+            self.notifier._spawn(["true"])
+
+    def act(self):
+        # A few timers are touched by "the user" every step
+        for core in self.rng.sample(self.cores, max(1, len(self.cores) // 50)):
+            action = self.rng.random()
+            if core.is_running and action < 0.3:
+                core.pause()
+            elif not core.is_running and action < 0.6:
+                core.start()
+            elif not core.is_running:
+                core.set_time(self.rng.choice(LENGTHS))
+                core.start()
+            elif action < 0.4:
+                core.set_ticking(not core.ticking)
+
+    def check(self):
+        running = {core for core in self.cores if core.is_running}
+        assert self.clock.pending_sources() <= 1, f"{self.clock.pending_sources()} clock sources armed"
+        assert self.scheduler.timers == running, "scheduler tracks stopped timers"
+        assert (self.scheduler.source is not None) == bool(running), "scheduler source out of sync"
+
+    def stop(self):
+        for core in self.cores:
+            core.pause()
+        for cycle in self.cycles:
+            cycle.disconnect()
+        assert self.clock.pending_sources() == 0, f"{self.clock.pending_sources()} clock sources left"
+        assert self.scheduler.source is None and not self.scheduler.timers
+
+
+def reap(notifier):
+    # Lets the main context collect the children spawned so far
+    from gi.repository import GLib
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + REAP_TIMEOUT
+    while notifier.pending_subprocesses and time.monotonic() < deadline:
+        context.iteration(False)
+        time.sleep(0.001)
+    assert not notifier.pending_subprocesses, f"{len(notifier.pending_subprocesses)} unreaped subprocesses"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--timers", type=int, default=200)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-growth", type=int, default=5000,
+                        help="allocated blocks the run may grow by after the first hour")
+    parser.add_argument("--subprocesses", action="store_true",
+                        help="reap a child per finished timer through FinishNotifier")
+    args = parser.parse_args()
+
+    notifier = None
+    if args.subprocesses:
+        from notifications import FinishNotifier
+        notifier = FinishNotifier(None)
+
+    soak = Soak(args.timers, args.seed, notifier)
+    print(f"{'hour':>4} {'cpu ms':>8} {'wakeups':>8} {'finished':>9} {'running':>8} {'blocks':>9}")
+    baseline = None
+    failed = False
+    try:
+        for hour in range(1, args.hours + 1):
+            cpu = time.process_time()
+            wakeups = soak.clock.wakeups
+            finished = soak.finished
+            for _ in range(3600 // STEP):
+                soak.clock.advance(STEP)
+                soak.act()
+                soak.check()
+            cpu = (time.process_time() - cpu) * 1000
+            if notifier is not None:
+                reap(notifier)
+            gc.collect()
+            blocks = sys.getallocatedblocks()
+            if baseline is None:
+                baseline = blocks
+            running = sum(core.is_running for core in soak.cores)
+            print(f"{hour:>4} {cpu:>8.1f} {soak.clock.wakeups - wakeups:>8} "
+                  f"{soak.finished - finished:>9} {running:>8} {blocks - baseline:>+9}")
+            assert blocks - baseline <= args.max_growth, f"allocated blocks grew by {blocks - baseline}"
+        soak.stop()
+    except AssertionError as e:
+        print(f"FAIL: {e}")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
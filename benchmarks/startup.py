@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Cold/warm start benchmark for GTKetchup.
+
+Launches main.py with --profile-startup several times, waits for the
+per-phase report printed after the first frame, then terminates the app.
+
+"Cold" runs use an empty bytecode cache (PYTHONPYCACHEPREFIX pointing at a
+fresh directory) so every module is compiled again; "warm" runs reuse the
+cache of the previous run. Each run gets a private session bus through
+dbus-run-session when available so an already running instance does not
+swallow the launch. Needs a display (Wayland, X11 or e.g. xvfb-run).
+
+    python3 benchmarks/startup.py --runs 10
+"""
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASE_RE = re.compile(r"^\s+(\S.*?)\s+([\d.]+) ms$")
+
+
+def run_once(pycache_dir, timeout):
+    cmd = [sys.executable, os.path.join(ROOT, "main.py"), "--profile-startup"]
+    if shutil.which("dbus-run-session"):
+        cmd = ["dbus-run-session", "--"] + cmd
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache_dir)
+
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True, env=env)
+    phases = {}
+    try:
+        deadline = started + timeout
+        for line in proc.stdout:
+            match = PHASE_RE.match(line)
+            if match:
+                phases[match.group(1)] = float(match.group(2))
+                if match.group(1) == "total":
+                    break
+            if time.perf_counter() > deadline:
+                break
+        wall = (time.perf_counter() - started) * 1000
+    finally:
+        proc.terminate()
+        proc.wait()
+    if "total" not in phases:
+        raise RuntimeError("no startup profile received (is a display available?)")
+    phases["wall (spawn to first frame)"] = wall
+    return phases
+
+
+def summarize(label, runs):
+    print(f"{label} ({len(runs)} runs)")
+    for phase in runs[0]:
+        values = [run[phase] for run in runs]
+        print(f"  {phase:<28} mean {statistics.mean(values):8.1f} ms   min {min(values):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as pycache_dir:
+            cold.append(run_once(pycache_dir, args.timeout))
+            warm.append(run_once(pycache_dir, args.timeout))
+
+    summarize("Cold start", cold)
+    summarize("Warm start", warm)
+
+
+if __name__ == "__main__":
+    main()
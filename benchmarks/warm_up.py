@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""First-use cost of dial state changes, with and without the idle warm-up.
+
+Walks one dial through the state changes a user can trigger (hovering the
+buttons, starting and pausing, scrolling past 99 minutes and into the hours
+view) and paints a frame after each, once from cold caches and once after
+running the warm-up the widget schedules after its first frame. Reports
+the slowest frame and the jank events (fonts, layouts, atlases, surfaces
+or nodes first created while drawing) of each run, and exits non-zero if
+any jank event remains after the warm-up. Needs a display for GTK (or
+e.g. xvfb-run).
+
+    python3 benchmarks/warm_up.py --renderer gsk --scale 2
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gi
+
+gi.require_version('Gtk', '4.0')
+
+from gi.repository import Gtk
+import cairo
+
+from pomodoro import release_caches
+from render import make_timer
+
+STEPS = [
+    ("hover play", lambda timer: setattr(timer, "hover", "play")),
+    ("hover reset", lambda timer: setattr(timer, "hover", "reset")),
+    ("hover zero", lambda timer: setattr(timer, "hover", "zero")),
+    ("start", lambda timer: (setattr(timer, "hover", None), timer.core.start())),
+    ("pause", lambda timer: timer.core.pause()),
+    ("100 min", lambda timer: timer.core.set_time(100 * 60)),
+    ("1h30 hours view", lambda timer: timer.core.set_time(90 * 60)),
+    ("999 min", lambda timer: timer.core.set_time(999 * 60)),
+    ("back to 25:00", lambda timer: timer.core.set_time(25 * 60)),
+]
+
+
+def make_painter(timer, renderer, size):
+    if renderer == "cairo":
+        return lambda cr: timer.on_draw(None, cr, size, size)
+
+    def paint_nodes(cr):
+        snapshot = Gtk.Snapshot()
+        timer.snapshot_dial(snapshot, size, size)
+        node = snapshot.to_node()
+        if node is not None:
+            node.draw(cr)
+    return paint_nodes
+
+
+def run(renderer, size, scale, warm):
+    release_caches()
+    timer = make_timer(25 * 60, False)
+    timer.set_renderer(renderer)
+    # What a realized widget on a HiDPI screen reports; caches are keyed on it
+    timer.get_scale_factor = lambda: scale
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, size * scale, size * scale)
+    surface.set_device_scale(scale, scale)
+    paint = make_painter(timer, renderer, size)
+    warm_up_ms = 0.0
+    paint(cairo.Context(surface))
+    if warm:
+        # What the idle steps do after the first frame, all at once
+        start = time.perf_counter()
+        timer._warming = True
+        for _ in timer._warm_up_steps(size, size):
+            pass
+        timer._warming = False
+        warm_up_ms = (time.perf_counter() - start) * 1000
+    first_frame_jank = timer.jank_events
+
+    slowest = 0.0
+    for label, step in STEPS:
+        step(timer)
+        start = time.perf_counter()
+        paint(cairo.Context(surface))
+        surface.flush()
+        slowest = max(slowest, (time.perf_counter() - start) * 1000)
+    return warm_up_ms, slowest, timer.jank_events - first_frame_jank
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renderer", choices=("cairo", "gsk"), default="cairo")
+    parser.add_argument("--size", type=int, default=400)
+    parser.add_argument("--scale", type=int, default=1, help="device scale factor")
+    args = parser.parse_args()
+
+    Gtk.init()
+    print(f"{'run':<10} {'warm-up ms':>11} {'slowest frame ms':>17} {'jank events':>12}")
+    failed = False
+    for label, warm in (("cold", False), ("warmed up", True)):
+        warm_up_ms, slowest, jank = run(args.renderer, args.size, args.scale, warm)
+        print(f"{label:<10} {warm_up_ms:>11.2f} {slowest:>17.2f} {jank:>12}")
+        failed = failed or (warm and jank)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+import json
+import os
+
+from gi.repository import Gio, GLib
+
+CONFIG_PATH = os.path.expanduser("~/.config/gtketchup_gnome.json")
+
+DEFAULT_CONFIG = {
+    "default_time": 25,
+    "scroll_min_step": 5,
+    "scroll_sec_step": 5,
+    "show_tutorial": True,
+    "animations": False,
+    "cycle_enabled": False,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "renderer": "cairo"
+}
+
+# Changes made within this window are written out together
+SAVE_DELAY_MS = 500
+
+SCHEMA_ID = "com.github.geraldohomero.GTKetchup"
+
+
+def open_config(backend=None):
+    # GSettings when the schema is installed (always the case in the
+    # Flatpak); a checkout without compiled schemas keeps using the JSON file
+    source = Gio.SettingsSchemaSource.get_default()
+    schema = source.lookup(SCHEMA_ID, True) if source else None
+    if schema is None:
+        return ConfigStore()
+    return SettingsConfig(schema, backend)
+
+
+class ConfigStore:
+    """Dict-like view of the JSON config file.
+
+    The file is read with load_contents_async(). Assigning a key that really
+    changes marks it dirty and (re)arms a debounce timer; the write itself is
+    an atomic replace_contents_bytes_async() that is skipped when the
+    serialized contents match what is already on disk.
+    """
+
+    def __init__(self, path=CONFIG_PATH):
+        self.file = Gio.File.new_for_path(path)
+        self.values = dict(DEFAULT_CONFIG)
+        self.dirty = set()
+        self.loaded = False
+        self._load_callbacks = []
+        self._save_source = None
+        self._saving = False
+        self._written = None
+        self._listeners = {}
+        self._next_listener_id = 1
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __setitem__(self, key, value):
+        if key in self.values and self.values[key] == value:
+            return
+        self.values[key] = value
+        self.dirty.add(key)
+        self._queue_save()
+        for listener_key, callback in list(self._listeners.values()):
+            if listener_key == key:
+                callback(key)
+
+    def connect_changed(self, key, callback):
+        listener_id = self._next_listener_id
+        self._next_listener_id += 1
+        self._listeners[listener_id] = (key, callback)
+        return listener_id
+
+    def disconnect(self, listener_id):
+        self._listeners.pop(listener_id, None)
+
+    def bind(self, key, widget, prop):
+        # Two-way binding like Gio.Settings.bind()
+        widget.set_property(prop, self.values[key])
+        cast = type(DEFAULT_CONFIG.get(key, self.values[key]))
+        widget.connect(f"notify::{prop}", lambda w, pspec: self.__setitem__(key, cast(w.get_property(prop))))
+        listener_id = self.connect_changed(key, lambda k: widget.set_property(prop, self.values[k]))
+        widget.connect("destroy", lambda w: self.disconnect(listener_id))
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def load_async(self):
+        self.file.load_contents_async(None, self._on_loaded)
+
+    def _on_loaded(self, file, result):
+        try:
+            _, contents, _ = file.load_contents_finish(result)
+            text = contents.decode()
+            values = json.loads(text)
+            if not isinstance(values, dict):
+                raise ValueError("not a JSON object")
+            self.values.update(values)
+            self._written = text
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND):
+                print("Failed to load config:", e.message)
+        except (ValueError, TypeError, AttributeError) as e:
+            # Whatever is in the file, the app has to start with the defaults
+            print("Failed to load config:", e)
+        self.loaded = True
+        callbacks, self._load_callbacks = self._load_callbacks, []
+        for callback, args in callbacks:
+            callback(*args)
+
+    def run_when_loaded(self, callback, *args):
+        if self.loaded:
+            callback(*args)
+        else:
+            self._load_callbacks.append((callback, args))
+
+    def _queue_save(self):
+        if self._save_source:
+            GLib.source_remove(self._save_source)
+        self._save_source = GLib.timeout_add(SAVE_DELAY_MS, self._on_save_timeout)
+
+    def _on_save_timeout(self):
+        self._save_source = None
+        self.save_async()
+        return False
+
+    def save_async(self):
+        if self._saving:
+            # Picked up again once the write in flight has finished
+            return
+        text = json.dumps(self.values)
+        self.dirty.clear()
+        if text == self._written:
+            return
+        self._saving = True
+        self.file.replace_contents_bytes_async(GLib.Bytes.new(text.encode()), None, False,
+                                               Gio.FileCreateFlags.NONE, None, self._on_saved, text)
+
+    def _on_saved(self, file, result, text):
+        self._saving = False
+        try:
+            file.replace_contents_finish(result)
+            self._written = text
+        except GLib.Error as e:
+            print("Failed to save config:", e.message)
+        if self.dirty:
+            self._queue_save()
+
+    def flush(self):
+        # Synchronous; only meant for shutdown, when there is no next frame
+        if self._save_source:
+            GLib.source_remove(self._save_source)
+            self._save_source = None
+        text = json.dumps(self.values)
+        if text == self._written:
+            return
+        try:
+            self.file.replace_contents(text.encode(), None, False, Gio.FileCreateFlags.NONE, None)
+            self._written = text
+        except GLib.Error as e:
+            print("Failed to save config:", e.message)
+
+
+class SettingsConfig:
+    """The same dict-like interface as ConfigStore, backed by GSettings.
+
+    Keys keep their JSON names (``default_time`` is the ``default-time``
+    GSettings key). Changes made anywhere, including by another instance
+    or ``gsettings set``, are reported per key through connect_changed().
+    Pass a memory or keyfile backend to keep tests off the user's dconf.
+    On first run the values of the old JSON file are copied over.
+    """
+
+    def __init__(self, schema, backend=None, json_path=CONFIG_PATH):
+        self.settings = Gio.Settings.new_full(schema, backend, None)
+        self.json_file = Gio.File.new_for_path(json_path)
+        self.loaded = False
+        self._load_callbacks = []
+
+    def __getitem__(self, key):
+        return self.settings.get_value(key.replace("_", "-")).unpack()
+
+    def __setitem__(self, key, value):
+        name = key.replace("_", "-")
+        current = self.settings.get_value(name)
+        if current.unpack() != value:
+            self.settings.set_value(name, GLib.Variant(current.get_type_string(), value))
+
+    def __contains__(self, key):
+        return self.settings.props.settings_schema.has_key(key.replace("_", "-"))
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def connect_changed(self, key, callback):
+        return self.settings.connect(f"changed::{key.replace('_', '-')}", lambda settings, name: callback(key))
+
+    def disconnect(self, handler_id):
+        self.settings.disconnect(handler_id)
+
+    def bind(self, key, widget, prop):
+        self.settings.bind(key.replace("_", "-"), widget, prop, Gio.SettingsBindFlags.DEFAULT)
+
+    def load_async(self):
+        if self.settings.get_boolean("json-migrated"):
+            self._finish_loading()
+        else:
+            self.json_file.load_contents_async(None, self._on_json_loaded)
+
+    def _on_json_loaded(self, file, result):
+        try:
+            _, contents, _ = file.load_contents_finish(result)
+            values = json.loads(contents.decode())
+            if not isinstance(values, dict):
+                raise ValueError("not a JSON object")
+            self.settings.delay()
+            try:
+                for key, value in values.items():
+                    if key in DEFAULT_CONFIG and key in self:
+                        # One badly typed value only loses that key
+                        try:
+                            self[key] = value
+                        except (TypeError, ValueError, OverflowError) as e:
+                            print(f"Failed to migrate config key {key}:", e)
+            finally:
+                # Left in delay mode, no later change would reach the backend
+                self.settings.apply()
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND):
+                print("Failed to migrate config:", e.message)
+        except (ValueError, TypeError, AttributeError) as e:
+            print("Failed to migrate config:", e)
+        self.settings.set_boolean("json-migrated", True)
+        self._finish_loading()
+
+    def _finish_loading(self):
+        self.loaded = True
+        callbacks, self._load_callbacks = self._load_callbacks, []
+        for callback, args in callbacks:
+            callback(*args)
+
+    def run_when_loaded(self, callback, *args):
+        if self.loaded:
+            callback(*args)
+        else:
+            self._load_callbacks.append((callback, args))
+
+    def flush(self):
+        # Push pending writes to the backend before the process exits
+        Gio.Settings.sync()
@@ -0,0 +1,146 @@
+from timer_core import USEC_PER_SEC, WORK, SHORT_BREAK, LONG_BREAK
+
+# How far ahead the schedule is planned whenever the cycle is (re)started
+DAY_US = 24 * 3600 * USEC_PER_SEC
+# Settings that change the plan of a running session
+CYCLE_KEYS = ("cycle_enabled", "default_time", "short_break", "long_break", "cycles_before_long_break")
+
+
+class DictConfig(dict):
+    """Plain dict with ConfigStore's change listeners, for code without gi."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._listeners = {}
+        self._next_listener_id = 1
+
+    def __setitem__(self, key, value):
+        if self.get(key) == value:
+            return
+        super().__setitem__(key, value)
+        for listener_key, callback in list(self._listeners.values()):
+            if listener_key == key:
+                callback(key)
+
+    def connect_changed(self, key, callback):
+        listener_id = self._next_listener_id
+        self._next_listener_id += 1
+        self._listeners[listener_id] = (key, callback)
+        return listener_id
+
+    def disconnect(self, listener_id):
+        self._listeners.pop(listener_id, None)
+
+
+class PomodoroCycle:
+    """Chains work, short break and long break phases on one TimerCore.
+
+    Whenever the user starts the timer, the rest of the day is planned as a
+    list of ``(phase, seconds)`` entries. Each phase then starts from the
+    deadline of the one that just finished rather than from the moment its
+    wakeup ran, so phases never drift, and the only wakeups needed are the
+    core's own ones. That deadline is the one the scheduler moved for any
+    time spent suspended, and phases that ended while the machine slept are
+    skipped, so the cycle stays on the wall clock. The lengths are read from
+    the config (``default_time`` is the work length) and only apply while
+    ``cycle_enabled`` is set; changing them replans a running session from
+    its current deadline. Resetting the core (``TimerCore.reset()``)
+    starts over with the first work session.
+    """
+
+    def __init__(self, core, config):
+        self.core = core
+        self.config = config
+        self.completed = 0
+        self.schedule = []
+        self._advancing = False
+        self._handlers = [
+            core.connect("state-changed", self.on_state_changed),
+            core.connect("finished", self.on_finished),
+            core.connect("reset", self.on_reset),
+        ]
+        self._listeners = [config.connect_changed(key, self.on_config_changed) for key in CYCLE_KEYS]
+
+    def disconnect(self):
+        for handler_id in self._handlers:
+            self.core.disconnect(handler_id)
+        for listener_id in self._listeners:
+            self.config.disconnect(listener_id)
+        self._handlers = []
+        self._listeners = []
+
+    @property
+    def enabled(self):
+        return self.config.get("cycle_enabled", False)
+
+    def phase_seconds(self, phase):
+        if phase == SHORT_BREAK:
+            return self.config["short_break"] * 60
+        if phase == LONG_BREAK:
+            return self.config["long_break"] * 60
+        return self.config["default_time"] * 60
+
+    def next_phase(self, phase, completed):
+        # Returns the phase after ``phase`` and the updated work count
+        if phase != WORK:
+            return WORK, completed
+        completed += 1
+        if completed % max(1, self.config["cycles_before_long_break"]) == 0:
+            return LONG_BREAK, completed
+        return SHORT_BREAK, completed
+
+    def plan(self, deadline):
+        # Everything that follows the running phase, until a day from now
+        schedule = []
+        phase, completed = self.core.phase, self.completed
+        end = deadline + DAY_US
+        while True:
+            phase, completed = self.next_phase(phase, completed)
+            seconds = self.phase_seconds(phase)
+            deadline += seconds * USEC_PER_SEC
+            if deadline > end:
+                break
+            schedule.append((phase, seconds))
+        return schedule
+
+    def on_state_changed(self, core):
+        if core.is_running and not self._advancing and self.enabled:
+            self.schedule = self.plan(core.deadline)
+
+    def on_config_changed(self, key):
+        if self.core.is_running and self.enabled:
+            self.schedule = self.plan(self.core.deadline)
+        else:
+            self.schedule = []
+
+    def on_finished(self, core):
+        if not self.enabled:
+            core.phase = WORK
+            return
+        if core.phase == WORK:
+            self.completed += 1
+        now = core.clock.monotonic_time()
+        deadline = core.deadline
+        while self.schedule:
+            phase, seconds = self.schedule.pop(0)
+            deadline += seconds * USEC_PER_SEC
+            if deadline <= now:
+                # Over while the machine was asleep
+                if phase == WORK:
+                    self.completed += 1
+                continue
+            core.phase = phase
+            self._advancing = True
+            try:
+                core.set_time(seconds)
+                core.start(deadline)
+            finally:
+                self._advancing = False
+            return
+        # End of the planned day; wait for the user to start again
+        core.phase = WORK
+        core.set_time(self.phase_seconds(WORK))
+
+    def on_reset(self, core):
+        self.completed = 0
+        self.schedule = []
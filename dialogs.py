@@ -0,0 +1,160 @@
+import gi
+
+gi.require_version('Gtk', '4.0')
+gi.require_version('Adw', '1')
+
+from gi.repository import Gtk, Adw
+
+# Everything in this module is only needed once the user opens a menu entry
+# (or on the very first run), so main.py imports it on demand.
+
+
+class PreferencesWindow(Adw.PreferencesWindow):
+    def __init__(self, config, **kwargs):
+        super().__init__(**kwargs)
+        self.config = config
+
+        self.set_title("Preferences")
+        self.set_default_size(400, 300)
+
+        page = Adw.PreferencesPage()
+
+        # Every control is bound to its key, so changes apply (and are saved)
+        # immediately, and changes made elsewhere show up here
+        group = Adw.PreferencesGroup()
+        group.set_title("Timer Settings")
+
+        self.time_row = Adw.ActionRow()
+        self.time_row.set_title("Default Time (minutes)")
+        self.time_spin = Gtk.SpinButton.new_with_range(1, 999, 1)
+        self.time_spin.set_valign(Gtk.Align.CENTER)
+        self.config.bind("default_time", self.time_spin, "value")
+        self.time_row.add_suffix(self.time_spin)
+        group.add(self.time_row)
+
+        self.min_step_row = Adw.ActionRow()
+        self.min_step_row.set_title("Scroll Minute Step")
+        self.min_step_spin = Gtk.SpinButton.new_with_range(1, 60, 1)
+        self.min_step_spin.set_valign(Gtk.Align.CENTER)
+        self.config.bind("scroll_min_step", self.min_step_spin, "value")
+        self.min_step_row.add_suffix(self.min_step_spin)
+        group.add(self.min_step_row)
+
+        self.sec_step_row = Adw.ActionRow()
+        self.sec_step_row.set_title("Scroll Second Step")
+        self.sec_step_spin = Gtk.SpinButton.new_with_range(1, 60, 1)
+        self.sec_step_spin.set_valign(Gtk.Align.CENTER)
+        self.config.bind("scroll_sec_step", self.sec_step_spin, "value")
+        self.sec_step_row.add_suffix(self.sec_step_spin)
+        group.add(self.sec_step_row)
+
+        self.animations_row = Adw.SwitchRow()
+        self.animations_row.set_title("Smooth Animations")
+        self.animations_row.set_subtitle("Only animates while the window is focused")
+        self.config.bind("animations", self.animations_row, "active")
+        group.add(self.animations_row)
+
+        page.add(group)
+
+        cycle_group = Adw.PreferencesGroup()
+        cycle_group.set_title("Pomodoro Cycle")
+        cycle_group.set_description("Work sessions use the default time")
+
+        self.cycle_row = Adw.SwitchRow()
+        self.cycle_row.set_title("Start Next Phase Automatically")
+        self.config.bind("cycle_enabled", self.cycle_row, "active")
+        cycle_group.add(self.cycle_row)
+
+        self.short_break_spin = self._add_spin_row(cycle_group, "Short Break (minutes)", 1, 60, "short_break")
+        self.long_break_spin = self._add_spin_row(cycle_group, "Long Break (minutes)", 1, 120, "long_break")
+        self.cycles_spin = self._add_spin_row(cycle_group, "Long Break Every (sessions)", 1, 12,
+                                              "cycles_before_long_break")
+
+        page.add(cycle_group)
+        self.add(page)
+
+    def _add_spin_row(self, group, title, lower, upper, key):
+        row = Adw.ActionRow()
+        row.set_title(title)
+        spin = Gtk.SpinButton.new_with_range(lower, upper, 1)
+        spin.set_valign(Gtk.Align.CENTER)
+        self.config.bind(key, spin, "value")
+        row.add_suffix(spin)
+        group.add(row)
+        return spin
+
+
+def _format_focus(seconds):
+    hours, minutes = divmod(seconds // 60, 60)
+    return f"{hours} h {minutes} min" if hours else f"{minutes} min"
+
+
+def show_statistics(win, history):
+    # Everything here comes from the per-day aggregates, never the log itself
+    stats = history.stats
+    today_sessions, today_focus = stats.today()
+    week_sessions, week_focus = stats.week()
+
+    window = Adw.PreferencesWindow(transient_for=win, title="Statistics", search_enabled=False)
+    window.set_default_size(400, 360)
+    page = Adw.PreferencesPage()
+
+    rows = [
+        ("Today", f"{today_sessions} sessions, {_format_focus(today_focus)} focused"),
+        ("Last 7 Days", f"{week_sessions} sessions, {_format_focus(week_focus)} focused"),
+        ("Current Streak", f"{stats.current_streak()} days"),
+        ("Longest Streak", f"{stats.longest_streak()} days"),
+    ]
+    group = Adw.PreferencesGroup()
+    if not history.loaded:
+        group.set_description("Still loading history…")
+    for title, value in rows:
+        row = Adw.ActionRow(title=title)
+        row.add_suffix(Gtk.Label(label=value))
+        group.add(row)
+
+    page.add(group)
+    window.add(page)
+    window.present()
+
+
+def show_about(win):
+    about = Adw.AboutWindow(
+        transient_for=win,
+        application_name="GTKetchup",
+        application_icon="com.github.geraldohomero.gtketchup",
+        developer_name="Geraldo Homero",
+        version="1.0.1",
+        comments="A native GNOME Pomodoro Timer with custom Cairo visuals, formerly known as Pomodoro Timer.",
+        website="https://github.com/geraldohomero/GTKetchup"
+    )
+    about.present()
+
+
+def show_tutorial(win, config, force_show=False):
+    dialog = Adw.AlertDialog(heading="Welcome to GTKetchup!",
+                             body="Here are a few tips to get started:\n\n"
+                                  "• Scroll your mouse or trackpad anywhere to adjust Minutes.\n"
+                                  "• Hold Shift + Scroll to adjust Seconds.\n"
+                                  "• Click the timer text in the center to input exact numbers.\n"
+                                  "• Click the play button at the bottom to start/pause.")
+
+    dialog.add_response("ok", "Got it!")
+    dialog.set_default_response("ok")
+    dialog.set_close_response("ok")
+
+    check_btn = Gtk.CheckButton(label="Do not show this again")
+    check_btn.set_active(not config.get("show_tutorial", True) and not force_show)
+    check_btn.set_margin_top(10)
+    check_btn.set_halign(Gtk.Align.CENTER)
+
+    dialog.set_extra_child(check_btn)
+
+    def on_dialog_response(dlg, response):
+        if check_btn.get_active():
+            config["show_tutorial"] = False
+        else:
+            config["show_tutorial"] = True
+
+    dialog.connect("response", on_dialog_response)
+    dialog.present(win)
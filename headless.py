@@ -0,0 +1,235 @@
+"""Headless GTKetchup: the timer on a bare GLib main loop, without any UI.
+
+Runs the same TimerCore, cycle and history code as the app, but imports
+nothing from Gtk, Adw, Pango or cairo. Status goes out as newline-delimited
+JSON on stdout, or to every client of a Unix socket, e.g.
+
+    python3 main.py --headless --set-time 25:00 --interval 60
+    python3 main.py --headless --socket /tmp/gtketchup.sock &
+    socat - UNIX-CONNECT:/tmp/gtketchup.sock
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+
+from gi.repository import Gio, GLib
+
+from config import open_config
+from cycle import PomodoroCycle
+from history import HistoryLog
+from timer_core import TickScheduler, TimerCore, parse_duration
+
+# Status a client may fall behind by before it is disconnected
+MAX_PENDING = 64 * 1024
+
+
+class StatusStream:
+    """Writes one JSON object per line to stdout or to socket clients."""
+
+    def __init__(self, socket_path=None):
+        self.socket_path = socket_path
+        self.service = None
+        # Connection -> bytes a slow client has not taken yet
+        self.clients = {}
+        self._watches = {}
+        self.last = None
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.service = Gio.SocketService.new()
+            self.service.add_address(Gio.UnixSocketAddress.new(socket_path),
+                                     Gio.SocketType.STREAM, Gio.SocketProtocol.DEFAULT, None)
+            self.service.connect("incoming", self.on_incoming)
+            self.service.start()
+
+    def on_incoming(self, service, connection, source_object):
+        connection.get_socket().set_blocking(False)
+        self.clients[connection] = bytearray()
+        # New clients start with the current status
+        if self.last is not None:
+            self._send(connection, self.last)
+        return False
+
+    def _send(self, connection, line):
+        pending = self.clients[connection]
+        waiting = bool(pending)
+        pending += line
+        if len(pending) > MAX_PENDING:
+            self._drop(connection, "client too slow")
+        elif not waiting:
+            self._flush(connection)
+
+    def _flush(self, connection):
+        self._watches.pop(connection, None)
+        pending = self.clients.get(connection)
+        if pending is None:
+            return False
+        socket = connection.get_socket()
+        try:
+            while pending:
+                # A non-blocking send may take only part of a line
+                del pending[:socket.send(bytes(pending), None)]
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.WOULD_BLOCK):
+                self._drop(connection, e.message)
+                return False
+            source = socket.create_source(GLib.IOCondition.OUT, None)
+            source.set_callback(lambda *args: self._flush(connection))
+            source.attach(None)
+            self._watches[connection] = source
+        return False
+
+    def _drop(self, connection, reason):
+        print("Failed to write status to client:", reason, file=sys.stderr)
+        source = self._watches.pop(connection, None)
+        if source is not None:
+            source.destroy()
+        del self.clients[connection]
+        connection.close()
+
+    def write(self, status):
+        line = (json.dumps(status, separators=(",", ":")) + "\n").encode()
+        self.last = line
+        if self.service is None:
+            sys.stdout.buffer.write(line)
+            sys.stdout.flush()
+            return
+        for connection in list(self.clients):
+            self._send(connection, line)
+
+    def close(self):
+        if self.service is not None:
+            self.service.stop()
+            self.service.close()
+            for source in self._watches.values():
+                source.destroy()
+            self._watches = {}
+            for connection in self.clients:
+                connection.close()
+            self.clients = {}
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class HeadlessTimer:
+    """Runs one timer until it (or its cycle) stops, reporting its status.
+
+    Nothing is displayed, so the core never ticks: the only wakeups are the
+    deadline itself and, with an ``interval``, one per status line.
+    """
+
+    def __init__(self, config, stream, seconds=None, interval=0):
+        self.config = config
+        self.stream = stream
+        self.interval = interval
+        self.seconds = seconds
+        self.loop = GLib.MainLoop()
+        self.history = HistoryLog()
+        self.core = TimerCore(0, scheduler=TickScheduler())
+        self.core.set_ticking(False)
+        self.core.connect("state-changed", self.on_state_changed)
+        self.core.connect("finished", self.on_finished)
+        self.history.track(self.core)
+        self.cycle = PomodoroCycle(self.core, config)
+        self._interval_source = None
+        self.exit_code = None
+
+    def status(self, event):
+        core = self.core
+        core.scheduler.catch_up()
+        now = core.clock.monotonic_time()
+        status = {
+            "event": event,
+            "state": "running" if core.is_running else ("finished" if core.time_seconds == 0 else "stopped"),
+            "phase": core.phase,
+            "remaining": core.get_remaining(now),
+            "initial": core.initial_time_seconds,
+        }
+        if core.is_running:
+            # Wall clock end in microseconds, as in the timer-deadline action
+            status["deadline"] = core.clock.real_time() + core.deadline - now
+        return status
+
+    def on_state_changed(self, core):
+        self.stream.write(self.status("state"))
+
+    def on_finished(self, core):
+        # The cycle may start the next phase right after this handler
+        GLib.idle_add(self.on_finished_idle)
+
+    def on_finished_idle(self):
+        if not self.core.is_running:
+            self.loop.quit()
+        return False
+
+    def on_interval(self):
+        if self.core.is_running:
+            self.stream.write(self.status("tick"))
+        return True
+
+    def on_quit_signal(self):
+        if self.core.is_running:
+            self.core.pause()
+        self.loop.quit()
+        return False
+
+    def start(self):
+        seconds = self.seconds
+        if seconds is None:
+            seconds = self.config["default_time"] * 60
+        self.core.set_time(seconds)
+        if not self.core.start():
+            # Nothing to count down. The config may have loaded before the
+            # loop runs, so run() checks exit_code rather than relying on quit()
+            self.stream.write(self.status("state"))
+            self.exit_code = 1
+            self.loop.quit()
+            return
+        if self.interval > 0:
+            self._interval_source = GLib.timeout_add_seconds(self.interval, self.on_interval)
+
+    def run(self):
+        self.history.load_async()
+        self.config.load_async()
+        self.config.run_when_loaded(self.start)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signum, self.on_quit_signal)
+        if self.exit_code is None:
+            self.loop.run()
+        if self._interval_source:
+            GLib.source_remove(self._interval_source)
+            self._interval_source = None
+        self.history.flush()
+        self.config.flush()
+        self.stream.close()
+        return self.exit_code or 0
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="GTKetchup --headless",
+                                     description="Run a timer without a window, reporting its status as JSON lines.")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--set-time", metavar="TIME",
+                        help="timer length (seconds, MM:SS or HH:MM:SS); defaults to the default time setting")
+    parser.add_argument("--interval", type=int, default=0, metavar="SECONDS",
+                        help="also report the remaining time this often while running (default: only on changes)")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="serve the status on this Unix socket instead of stdout")
+    args = parser.parse_args(argv[1:])
+
+    seconds = None
+    if args.set_time is not None:
+        try:
+            seconds = parse_duration(args.set_time)
+        except ValueError as e:
+            parser.error(str(e))
+
+    try:
+        stream = StatusStream(args.socket)
+    except GLib.Error as e:
+        print("Failed to listen on socket:", e.message, file=sys.stderr)
+        return 1
+    timer = HeadlessTimer(open_config(), stream, seconds, max(0, args.interval))
+    return timer.run()
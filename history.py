@@ -0,0 +1,393 @@
+import datetime
+import json
+import os
+import struct
+
+from gi.repository import Gio, GLib
+
+from timer_core import WORK
+
+HISTORY_DIR = os.path.join(GLib.get_user_data_dir(), "gtketchup")
+HISTORY_PATH = os.path.join(HISTORY_DIR, "history.bin")
+INDEX_PATH = os.path.join(HISTORY_DIR, "history-index.json")
+
+# One fixed-width record per session segment: end (unix seconds), planned
+# length, seconds actually run, kind
+RECORD = struct.Struct("<qIIB")
+FINISHED, PAUSED, RESET, BREAK = 0, 1, 2, 3
+
+# Sessions ending within this window are written out together
+WRITE_DELAY_MS = 2000
+
+
+def pack_record(end, planned, elapsed, kind):
+    return RECORD.pack(end, planned, elapsed, kind)
+
+
+def day_of(timestamp):
+    return datetime.date.fromtimestamp(timestamp).toordinal()
+
+
+class HistoryStats:
+    """Per-day aggregates of the history log.
+
+    ``days`` maps a date ordinal to ``[finished sessions, focus seconds]``.
+    It only grows by one entry per day, so queries cost the same no matter
+    how many records the log holds.
+    """
+
+    def __init__(self, records=0, days=None):
+        self.records = records
+        self.days = days if days is not None else {}
+
+    def add(self, end, planned, elapsed, kind):
+        if kind == BREAK:
+            # Kept in the log, but breaks are neither sessions nor focus time
+            self.records += 1
+            return
+        day = self.days.setdefault(day_of(end), [0, 0])
+        if kind == FINISHED:
+            day[0] += 1
+        day[1] += elapsed
+        self.records += 1
+
+    def add_bytes(self, data):
+        for record in RECORD.iter_unpack(data):
+            self.add(*record)
+
+    def to_json(self):
+        return json.dumps({"records": self.records,
+                           "days": {str(day): value for day, value in self.days.items()}})
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        return cls(data["records"], {int(day): value for day, value in data["days"].items()})
+
+    def totals(self, first_day, last_day):
+        sessions = focus = 0
+        for day in range(first_day, last_day + 1):
+            value = self.days.get(day)
+            if value:
+                sessions += value[0]
+                focus += value[1]
+        return sessions, focus
+
+    def today(self, today=None):
+        today = today or datetime.date.today().toordinal()
+        return self.totals(today, today)
+
+    def week(self, today=None):
+        # The last seven days, today included
+        today = today or datetime.date.today().toordinal()
+        return self.totals(today - 6, today)
+
+    def current_streak(self, today=None):
+        # Consecutive days with a finished session; today does not break
+        # the streak until it is over
+        today = today or datetime.date.today().toordinal()
+        day = today if self.days.get(today, (0,))[0] else today - 1
+        streak = 0
+        while self.days.get(day, (0,))[0]:
+            streak += 1
+            day -= 1
+        return streak
+
+    def longest_streak(self):
+        longest = streak = 0
+        previous = None
+        for day in sorted(day for day, value in self.days.items() if value[0]):
+            streak = streak + 1 if previous == day - 1 else 1
+            longest = max(longest, streak)
+            previous = day
+        return longest
+
+
+class HistoryLog:
+    """Append-only session log under the XDG data directory.
+
+    Records are buffered and appended in batches with write_all_async(); the
+    aggregates are kept in a small index file next to the log. On load, only
+    records past the index's record count (e.g. after a crash) are read.
+    """
+
+    def __init__(self, path=HISTORY_PATH, index_path=INDEX_PATH):
+        self.file = Gio.File.new_for_path(path)
+        self.index_file = Gio.File.new_for_path(index_path)
+        self.stats = HistoryStats()
+        self.loaded = False
+        self.pending = []
+        self._write_source = None
+        self._writing = False
+        # Where the next write goes instead of the end, after a torn record
+        self._append_offset = None
+        self._tracked = {}
+
+    def load_async(self):
+        # The directory the log lives in is created once, up front, rather
+        # than before every write
+        self.file.get_parent().make_directory_async(GLib.PRIORITY_DEFAULT, None, self._on_directory_made)
+
+    def _on_directory_made(self, file, result):
+        try:
+            file.make_directory_finish(result)
+        except GLib.Error as e:
+            if e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND):
+                # No XDG data directory at all yet; only on a first run
+                try:
+                    file.make_directory_with_parents(None)
+                except GLib.Error as e:
+                    print("Failed to create history directory:", e.message)
+            elif not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.EXISTS):
+                print("Failed to create history directory:", e.message)
+        self.index_file.load_contents_async(None, self._on_index_loaded)
+
+    def _on_index_loaded(self, file, result):
+        try:
+            _, contents, _ = file.load_contents_finish(result)
+            self.stats = HistoryStats.from_json(contents.decode())
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND):
+                print("Failed to load history index:", e.message)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print("Failed to load history index:", e)
+        self.file.query_info_async(Gio.FILE_ATTRIBUTE_STANDARD_SIZE, Gio.FileQueryInfoFlags.NONE,
+                                   GLib.PRIORITY_DEFAULT, None, self._on_log_queried)
+
+    def _on_log_queried(self, file, result):
+        try:
+            size = file.query_info_finish(result).get_size()
+        except GLib.Error as e:
+            if not e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.NOT_FOUND):
+                print("Failed to load history:", e.message)
+            self.stats = HistoryStats()
+            self._finish_loading()
+            return
+        records = size // RECORD.size
+        if size % RECORD.size:
+            # A torn final record from an interrupted write; the next write
+            # goes over it so later appends stay aligned
+            self._append_offset = records * RECORD.size
+        if self.stats.records > records:
+            # The log was replaced behind our back; rebuild from scratch
+            self.stats = HistoryStats()
+        missing = (records - self.stats.records) * RECORD.size
+        if not missing:
+            self._finish_loading()
+            return
+        file.read_async(GLib.PRIORITY_DEFAULT, None, self._on_log_opened, missing)
+
+    def _on_log_opened(self, file, result, missing):
+        try:
+            stream = file.read_finish(result)
+        except GLib.Error as e:
+            print("Failed to load history:", e.message)
+            self.stats = HistoryStats()
+            self._finish_loading()
+            return
+        offset = self.stats.records * RECORD.size
+        stream.skip_async(offset, GLib.PRIORITY_DEFAULT, None, self._on_log_skipped, (offset, missing))
+
+    def _on_log_skipped(self, stream, result, state):
+        offset, missing = state
+        try:
+            skipped = stream.skip_finish(result)
+        except GLib.Error as e:
+            print("Failed to load history:", e.message)
+            skipped = 0
+        offset -= skipped
+        if offset > 0 and skipped:
+            stream.skip_async(offset, GLib.PRIORITY_DEFAULT, None, self._on_log_skipped, (offset, missing))
+            return
+        if offset > 0:
+            stream.close_async(GLib.PRIORITY_DEFAULT, None, None)
+            self._finish_loading()
+            return
+        stream.read_bytes_async(missing, GLib.PRIORITY_DEFAULT, None, self._on_tail_read, (missing, b""))
+
+    def _on_tail_read(self, stream, result, state):
+        # Reads may come back short: whole records are added as they
+        # arrive, a partial one is carried over to the next read
+        missing, partial = state
+        try:
+            data = stream.read_bytes_finish(result).get_data() or b""
+        except GLib.Error as e:
+            print("Failed to load history:", e.message)
+            data = b""
+        missing -= len(data)
+        data = partial + data
+        whole = len(data) - len(data) % RECORD.size
+        try:
+            self.stats.add_bytes(data[:whole])
+        except struct.error as e:
+            print("Failed to load history:", e)
+            missing = 0
+        if data and missing > 0:
+            stream.read_bytes_async(missing, GLib.PRIORITY_DEFAULT, None, self._on_tail_read,
+                                    (missing, data[whole:]))
+            return
+        self._save_index()
+        stream.close_async(GLib.PRIORITY_DEFAULT, None, None)
+        self._finish_loading()
+
+    def _finish_loading(self):
+        self.loaded = True
+        for record in self.pending:
+            self.stats.add(*record)
+        if self.pending:
+            self._queue_write()
+
+    def track(self, core):
+        # Records every run of the core: finished, paused, or reset while
+        # paused part-way
+        session = {"planned": 0, "started": 0, "paused_at": None, "open": False, "running": False}
+        self._tracked[core] = (session, [
+            core.connect("state-changed", self._on_state_changed, session),
+            core.connect("changed", self._on_changed, session),
+        ])
+
+    def untrack(self, core):
+        session, handlers = self._tracked.pop(core)
+        for handler_id in handlers:
+            core.disconnect(handler_id)
+
+    def _on_state_changed(self, core, session):
+        session["running"] = core.is_running
+        if core.is_running:
+            if not session["open"]:
+                session["planned"] = core.time_seconds
+                session["open"] = True
+            session["started"] = core.time_seconds
+            return
+        kind = FINISHED if core.time_seconds == 0 else PAUSED
+        if core.phase != WORK:
+            kind = BREAK
+        self.append(core, session, session["started"] - core.time_seconds, kind)
+        session["paused_at"] = core.time_seconds
+        if kind == FINISHED:
+            session["open"] = False
+
+    def _on_changed(self, core, session):
+        # A finishing core emits "changed" before "state-changed", so the
+        # session still counts as running then
+        if session["open"] and not session["running"] and core.time_seconds != session["paused_at"]:
+            self.append(core, session, 0, RESET)
+            session["open"] = False
+
+    def append(self, core, session, elapsed, kind):
+        record = (core.clock.real_time() // 1000000, session["planned"], max(0, elapsed), kind)
+        self.pending.append(record)
+        if self.loaded:
+            self.stats.add(*record)
+            self._queue_write()
+
+    def _queue_write(self):
+        if self._write_source:
+            GLib.source_remove(self._write_source)
+        self._write_source = GLib.timeout_add(WRITE_DELAY_MS, self._on_write_timeout)
+
+    def _on_write_timeout(self):
+        self._write_source = None
+        self.write_async()
+        return False
+
+    def write_async(self):
+        if self._writing or not self.pending or not self.loaded:
+            return
+        self._writing = True
+        batch, self.pending = self.pending, []
+        data = b"".join(pack_record(*record) for record in batch)
+        if self._append_offset is None:
+            self.file.append_to_async(Gio.FileCreateFlags.NONE, GLib.PRIORITY_DEFAULT, None,
+                                      self._on_append_opened, data, batch)
+        else:
+            self.file.open_readwrite_async(GLib.PRIORITY_DEFAULT, None, self._on_torn_log_opened, data, batch)
+
+    def _on_append_opened(self, file, result, data, batch):
+        try:
+            stream = file.append_to_finish(result)
+        except GLib.Error as e:
+            print("Failed to save history:", e.message)
+            self._on_write_failed(batch)
+            return
+        stream.write_all_async(data, GLib.PRIORITY_DEFAULT, None, self._on_written, batch, stream)
+
+    def _on_torn_log_opened(self, file, result, data, batch):
+        try:
+            io_stream = file.open_readwrite_finish(result)
+            # Only moves the file offset; any batch is longer than the torn
+            # record it overwrites
+            io_stream.seek(self._append_offset, GLib.SeekType.SET, None)
+        except GLib.Error as e:
+            print("Failed to save history:", e.message)
+            self._on_write_failed(batch)
+            return
+        io_stream.get_output_stream().write_all_async(data, GLib.PRIORITY_DEFAULT, None,
+                                                      self._on_written, batch, io_stream)
+
+    def _on_written(self, stream, result, batch, closable):
+        try:
+            stream.write_all_finish(result)
+        except GLib.Error as e:
+            print("Failed to save history:", e.message)
+            closable.close_async(GLib.PRIORITY_DEFAULT, None, None)
+            self._on_write_failed(batch)
+            return
+        self._append_offset = None
+        closable.close_async(GLib.PRIORITY_DEFAULT, None, self._on_closed)
+
+    def _on_closed(self, stream, result):
+        try:
+            stream.close_finish(result)
+        except GLib.Error as e:
+            print("Failed to save history:", e.message)
+        self._writing = False
+        self._save_index()
+        if self.pending:
+            self._queue_write()
+
+    def _on_write_failed(self, batch):
+        self._writing = False
+        self.pending[:0] = batch
+
+    def _save_index(self):
+        # The index must not count records that are not on disk yet; it is
+        # saved again after the write that takes them
+        if self.pending:
+            return
+        self.index_file.replace_contents_bytes_async(GLib.Bytes.new(self.stats.to_json().encode()), None, False,
+                                                     Gio.FileCreateFlags.NONE, None, self._on_index_saved)
+
+    def _on_index_saved(self, file, result):
+        try:
+            file.replace_contents_finish(result)
+        except GLib.Error as e:
+            print("Failed to save history index:", e.message)
+
+    def flush(self):
+        # Synchronous; only meant for shutdown
+        context = GLib.MainContext.default()
+        while self._writing:
+            # Let the batch in flight land, or fail back into pending
+            context.iteration(True)
+        if self._write_source:
+            GLib.source_remove(self._write_source)
+            self._write_source = None
+        if not self.loaded or not self.pending:
+            return
+        data = b"".join(pack_record(*record) for record in self.pending)
+        try:
+            os.makedirs(os.path.dirname(self.file.get_path()), exist_ok=True)
+            if self._append_offset is None:
+                with open(self.file.get_path(), "ab") as f:
+                    f.write(data)
+            else:
+                with open(self.file.get_path(), "r+b") as f:
+                    f.seek(self._append_offset)
+                    f.write(data)
+                self._append_offset = None
+            self.pending = []
+            self.index_file.replace_contents(self.stats.to_json().encode(), None, False,
+                                             Gio.FileCreateFlags.NONE, None)
+        except (OSError, GLib.Error) as e:
+            print("Failed to save history:", e)
@@ -1,5 +1,18 @@
+import time
+
+# Taken before anything else is imported so --profile-startup can report
+# how long the imports themselves take.
+_IMPORT_START = time.perf_counter()
+
 import sys
-import json
+
+if __name__ == '__main__' and "--headless" in sys.argv[1:]:
+    # Decided before anything below loads Gtk and Adw
+    from headless import main as headless_main
+    sys.exit(headless_main(sys.argv))
+
+import ctypes
+import gc
 import os
 import gi
 
@@ -7,140 +20,192 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 
 from gi.repository import Gtk, Gdk, Gio, Adw, GLib
-from pomodoro import PomodoroTimer
-
-CONFIG_PATH = os.path.expanduser("~/.config/gtketchup_gnome.json")
-
-def load_config():
-    default_config = {
-        "default_time": 25,
-        "scroll_min_step": 5,
-        "scroll_sec_step": 5,
-        "show_tutorial": True
-    }
-    if os.path.exists(CONFIG_PATH):
-        try:
-            with open(CONFIG_PATH, 'r') as f:
-                config = json.load(f)
-                return {**default_config, **config}
-        except Exception as e:
-            print("Failed to load config:", e)
-    return default_config
-
-def save_config(config):
-    try:
-        with open(CONFIG_PATH, 'w') as f:
-            json.dump(config, f)
-    except Exception as e:
-        print("Failed to save config:", e)
-
-
-class PreferencesWindow(Adw.PreferencesWindow):
-    def __init__(self, main_window, config, **kwargs):
-        super().__init__(**kwargs)
-        self.main_window = main_window
-        self.config = config
-        
-        self.set_title("Preferences")
-        self.set_default_size(400, 300)
-        
-        page = Adw.PreferencesPage()
-        
-        group = Adw.PreferencesGroup()
-        group.set_title("Timer Settings")
-        
-        self.time_row = Adw.ActionRow()
-        self.time_row.set_title("Default Time (minutes)")
-        self.time_spin = Gtk.SpinButton.new_with_range(1, 999, 1)
-        self.time_spin.set_valign(Gtk.Align.CENTER)
-        self.time_spin.set_value(self.config["default_time"])
-        self.time_row.add_suffix(self.time_spin)
-        group.add(self.time_row)
-        
-        self.min_step_row = Adw.ActionRow()
-        self.min_step_row.set_title("Scroll Minute Step")
-        self.min_step_spin = Gtk.SpinButton.new_with_range(1, 60, 1)
-        self.min_step_spin.set_valign(Gtk.Align.CENTER)
-        self.min_step_spin.set_value(self.config["scroll_min_step"])
-        self.min_step_row.add_suffix(self.min_step_spin)
-        group.add(self.min_step_row)
-        
-        self.sec_step_row = Adw.ActionRow()
-        self.sec_step_row.set_title("Scroll Second Step")
-        self.sec_step_spin = Gtk.SpinButton.new_with_range(1, 60, 1)
-        self.sec_step_spin.set_valign(Gtk.Align.CENTER)
-        self.sec_step_spin.set_value(self.config["scroll_sec_step"])
-        self.sec_step_row.add_suffix(self.sec_step_spin)
-        group.add(self.sec_step_row)
-        
-        page.add(group)
-        self.add(page)
-        
-        self.connect("close-request", self.on_close)
-        
-    def on_close(self, window):
-        self.config["default_time"] = self.time_spin.get_value_as_int()
-        self.config["scroll_min_step"] = self.min_step_spin.get_value_as_int()
-        self.config["scroll_sec_step"] = self.sec_step_spin.get_value_as_int()
-        save_config(self.config)
-        
-        self.main_window.timer.apply_config(self.config)
-        return False
+from config import open_config
+from history import HistoryLog
+from cycle import PomodoroCycle
+from timer_core import LONG_BREAK, SHORT_BREAK, WORK, TickScheduler, TimerCore, parse_duration
+
+# pomodoro (Pango, PangoCairo, cairo) is imported when the first window is
+# built, and dialogs (preferences, about, tutorial) on first use.
+
+# After the last running timer stops in background mode, wait this long
+# before letting the process exit, so the finish sound can play and the
+# next cycle phase can start
+BACKGROUND_GRACE_SECONDS = 10
+
+
+class StartupProfile:
+    def __init__(self, start):
+        self.start = start
+        self.last = start
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        print("Startup profile:")
+        for phase, seconds in self.phases:
+            print(f"  {phase:<14} {seconds * 1000:8.1f} ms")
+        print(f"  {'total':<14} {(self.last - self.start) * 1000:8.1f} ms")
+        sys.stdout.flush()
 
 
 class PomodoroWindow(Adw.ApplicationWindow):
-    def __init__(self, config, **kwargs):
+    def __init__(self, config, cores, **kwargs):
         super().__init__(**kwargs)
         self.config = config
-        
+
         self.set_title("GTKetchup")
         self.set_default_size(500, 500)
-        
+
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        
+
         header = Adw.HeaderBar()
-        
+
         menu_button = Gtk.MenuButton()
         menu_button.set_icon_name("open-menu-symbolic")
-        
+
         menu_model = Gio.Menu()
         menu_model.append("Preferences", "app.preferences")
+        menu_model.append("Statistics", "app.statistics")
         menu_model.append("Show Tutorial", "app.tutorial")
         menu_model.append("About GTKetchup", "app.about")
         menu_button.set_menu_model(menu_model)
-        
+
         header.pack_end(menu_button)
+
+        add_button = Gtk.Button.new_from_icon_name("list-add-symbolic")
+        add_button.set_tooltip_text("Add Timer")
+        add_button.set_action_name("app.add-timer")
+        header.pack_start(add_button)
+
         box.append(header)
-        
-        self.timer = PomodoroTimer(config)
-        
-        container = Gtk.CenterBox()
-        container.set_center_widget(self.timer)
+
+        self.timer_box = Gtk.FlowBox()
+        self.timer_box.set_selection_mode(Gtk.SelectionMode.NONE)
+        self.timer_box.set_homogeneous(True)
+        self.timer_box.set_valign(Gtk.Align.FILL)
+        self.timer_box.set_hexpand(True)
+        self.timer_box.set_vexpand(True)
+
+        self.timer_widgets = {}
+        for core in cores:
+            self.add_timer(core)
+
+        container = Gtk.ScrolledWindow()
+        container.set_child(self.timer_box)
         container.set_hexpand(True)
         container.set_vexpand(True)
-        
+
         box.append(container)
         self.set_content(box)
 
+        from pomodoro import FRAME_LOG_ENABLED
+
+        self.frame_log = None
+        if FRAME_LOG_ENABLED:
+            self.connect("realize", self.on_realize_frame_log)
+
+    def on_realize_frame_log(self, win):
+        from pomodoro import FrameTimeLog
+        self.frame_log = FrameTimeLog(self.get_frame_clock(), "GTKetchup")
+
+    def add_timer(self, core):
+        from pomodoro import PomodoroTimer
+
+        timer = PomodoroTimer(self.config, core)
+        child = timer
+        if self.timer_widgets:
+            # Every timer but the first one can be removed again
+            child = Gtk.Overlay()
+            child.set_child(timer)
+            close_button = Gtk.Button.new_from_icon_name("window-close-symbolic")
+            close_button.set_tooltip_text("Remove Timer")
+            close_button.add_css_class("flat")
+            close_button.add_css_class("circular")
+            close_button.set_halign(Gtk.Align.END)
+            close_button.set_valign(Gtk.Align.START)
+            close_button.connect("clicked", self.on_remove_timer_clicked, core)
+            child.add_overlay(close_button)
+        self.timer_box.append(child)
+        self.timer_widgets[core] = timer
+
+    def remove_timer(self, core):
+        timer = self.timer_widgets.pop(core)
+        self.timer_box.remove(timer.get_ancestor(Gtk.FlowBoxChild))
+
+    def on_remove_timer_clicked(self, button, core):
+        self.get_application().remove_timer(core)
+
 class MyApp(Adw.Application):
     def __init__(self):
         super().__init__(application_id='com.github.geraldohomero.GTKetchup',
-                         flags=Gio.ApplicationFlags.FLAGS_NONE)
-        self.config = load_config()
+                         flags=Gio.ApplicationFlags.HANDLES_COMMAND_LINE)
+        # Loaded asynchronously in do_startup; anything that depends on the
+        # stored values goes through config.run_when_loaded().
+        self.config = open_config()
+        self.history = HistoryLog()
+        self.profile = None
+
+        # Timers belong to the application, so remote commands work the
+        # same whether or not a window is open. All of them share a single
+        # scheduler and therefore a single wakeup per second.
+        self.scheduler = TickScheduler()
+        self.timers = []
+        self.cycles = {}
+        self.background = False
+        self.default_seconds = 0
+        self.timer_core = self.new_timer()
+        self.notifier = None
+
+        self.add_main_option("profile-startup", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                             "Print a per-phase startup timing breakdown", None)
+
+        # Forwarded to the running instance, so scripts do not pay for a
+        # second interpreter and GTK startup.
+        self.add_main_option("start", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                             "Start the timer", None)
+        self.add_main_option("pause", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                             "Pause the timer", None)
+        self.add_main_option("toggle", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                             "Start or pause the timer", None)
+        self.add_main_option("reset", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                             "Reset the timer to the default time", None)
+        self.add_main_option("set-time", 0, GLib.OptionFlags.NONE, GLib.OptionArg.STRING,
+                             "Set the timer (seconds, MM:SS or HH:MM:SS)", "TIME")
+        self.add_main_option("remaining", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+                             "Print the remaining seconds", None)
+
+    def do_handle_local_options(self, options):
+        if options.contains("profile-startup"):
+            self.profile = StartupProfile(_IMPORT_START)
+            self.profile.mark("imports")
+        return -1
 
     def do_startup(self):
         Adw.Application.do_startup(self)
+        self.config.load_async()
+        self.config.run_when_loaded(self.on_config_loaded)
+        self.config.connect_changed("default_time", self.on_default_time_changed)
+        self.history.load_async()
         Adw.StyleManager.get_default().set_color_scheme(Adw.ColorScheme.FORCE_DARK)
-        
+
         # Add current directory to icon theme search path to find local SVG
         icon_theme = Gtk.IconTheme.get_for_display(Gdk.Display.get_default())
         icon_theme.add_search_path(os.path.dirname(os.path.abspath(__file__)))
-        
+
         action_pref = Gio.SimpleAction.new("preferences", None)
         action_pref.connect("activate", self.on_preferences_action)
         self.add_action(action_pref)
         self.set_accels_for_action("app.preferences", ["<Primary>comma"])
 
+        action_stats = Gio.SimpleAction.new("statistics", None)
+        action_stats.connect("activate", self.on_statistics_action)
+        self.add_action(action_stats)
+
         action_tut = Gio.SimpleAction.new("tutorial", None)
         action_tut.connect("activate", self.on_tutorial_action)
         self.add_action(action_tut)
@@ -149,12 +214,252 @@ class MyApp(Adw.Application):
         action_about.connect("activate", self.on_about_action)
         self.add_action(action_about)
 
+        action_add_timer = Gio.SimpleAction.new("add-timer", None)
+        action_add_timer.connect("activate", self.on_add_timer_action)
+        self.add_action(action_add_timer)
+        self.set_accels_for_action("app.add-timer", ["<Primary>n"])
+
+        # Remote control, e.g. `gapplication action com.github.geraldohomero.GTKetchup set-time 300`
+        action_start = Gio.SimpleAction.new("start", None)
+        action_start.connect("activate", self.on_start_action)
+        self.add_action(action_start)
+
+        action_pause = Gio.SimpleAction.new("pause", None)
+        action_pause.connect("activate", self.on_pause_action)
+        self.add_action(action_pause)
+
+        action_reset = Gio.SimpleAction.new("reset", None)
+        action_reset.connect("activate", self.on_reset_action)
+        self.add_action(action_reset)
+
+        action_set_time = Gio.SimpleAction.new("set-time", GLib.VariantType.new("i"))
+        action_set_time.connect("activate", self.on_set_time_action)
+        self.add_action(action_set_time)
+
+        # Activating it stores the remaining seconds in its state, which is
+        # what D-Bus callers read back (org.gtk.Actions.Describe); the
+        # primary instance's stdout is nobody's
+        action_remaining = Gio.SimpleAction.new_stateful("query-remaining", None, GLib.Variant("i", 0))
+        action_remaining.connect("activate", self.on_query_remaining_action)
+        self.add_action(action_remaining)
+
+        # Wall clock end of the first timer in microseconds, 0 when stopped.
+        # Exported over D-Bus with the other actions (org.gtk.Actions), and
+        # only updated on start/pause/finish, never per second.
+        self.deadline_action = Gio.SimpleAction.new_stateful("timer-deadline", None, GLib.Variant("x", 0))
+        self.add_action(self.deadline_action)
+
+        action_background = Gio.SimpleAction.new("background", None)
+        action_background.connect("activate", self.on_background_action)
+        self.add_action(action_background)
+
+        action_show = Gio.SimpleAction.new("show-window", None)
+        action_show.connect("activate", lambda action, param: self.activate())
+        self.add_action(action_show)
+
+        from notifications import FinishNotifier
+        self.notifier = FinishNotifier(self)
+
+        if self.profile:
+            self.profile.mark("do_startup")
+
+    def do_shutdown(self):
+        self.config.flush()
+        self.history.flush()
+        Adw.Application.do_shutdown(self)
+
+    def on_config_loaded(self):
+        # Timers were created before the stored default time was known
+        for core in self.timers:
+            core.set_time(self.config["default_time"] * 60)
+        self.default_seconds = self.config["default_time"] * 60
+
+    def on_default_time_changed(self, key):
+        # Only stopped timers still showing the old default follow it;
+        # running or hand-set timers keep their time
+        old, self.default_seconds = self.default_seconds, self.config["default_time"] * 60
+        for core in self.timers:
+            if not core.is_running and core.time_seconds == old and core.phase == WORK:
+                core.set_time(self.default_seconds)
+
+    def do_command_line(self, command_line):
+        # Commands may depend on the stored config, so they wait for it; the
+        # hold keeps a freshly started instance alive until then.
+        self.hold()
+        self.config.run_when_loaded(self.handle_command_line, command_line)
+        return 0
+
+    def handle_command_line(self, command_line):
+        try:
+            command_line.set_exit_status(self.run_commands(command_line))
+        finally:
+            self.release()
+
+    def run_commands(self, command_line):
+        options = command_line.get_options_dict().end().unpack()
+        commands = options.keys() & {"start", "pause", "toggle", "reset", "set-time", "remaining"}
+        core = self.timer_core
+
+        if "set-time" in options:
+            try:
+                seconds = parse_duration(options["set-time"])
+            except ValueError as e:
+                command_line.printerr_literal(f"{e}\n")
+                return 1
+            if core.is_running:
+                command_line.printerr_literal("The timer is running; pause it before setting the time\n")
+                return 1
+            core.set_time(seconds)
+        if "reset" in options:
+            core.reset(self.config["default_time"] * 60)
+        if "start" in options:
+            core.start()
+        if "pause" in options:
+            core.pause()
+        if "toggle" in options:
+            core.toggle()
+        if "remaining" in options:
+            core.scheduler.catch_up()
+            remaining = core.get_remaining(core.clock.monotonic_time())
+            command_line.print_literal(f"{remaining}\n")
+
+        # A plain launch (or a command that started this instance) shows the
+        # window; commands sent to a background instance leave it hidden
+        if not commands or not (self.props.active_window or self.background):
+            self.activate()
+        return 0
+
+    def new_timer(self):
+        core = TimerCore(self.config["default_time"] * 60, scheduler=self.scheduler)
+        core.connect("state-changed", self.on_timer_state_changed)
+        self.history.track(core)
+        # Connected after the history, so it still sees the phase that just
+        # finished, and before the notification, which reports the phase the
+        # cycle went on with
+        self.cycles[core] = PomodoroCycle(core, self.config)
+        core.connect("finished", self.on_timer_finished)
+        self.timers.append(core)
+        return core
+
+    def remove_timer(self, core):
+        if core is self.timer_core:
+            return
+        core.pause()
+        self.history.untrack(core)
+        self.cycles.pop(core).disconnect()
+        self.timers.remove(core)
+        win = self.props.active_window
+        if win:
+            win.remove_timer(core)
+
+    def on_add_timer_action(self, action, param):
+        core = self.new_timer()
+        win = self.props.active_window
+        if win:
+            win.add_timer(core)
+
+    def on_timer_state_changed(self, core):
+        if core is self.timer_core:
+            deadline = 0
+            if core.is_running:
+                deadline = core.clock.real_time() + core.deadline - core.clock.monotonic_time()
+            self.deadline_action.set_state(GLib.Variant("x", deadline))
+        if self.background and not core.is_running:
+            GLib.timeout_add_seconds(BACKGROUND_GRACE_SECONDS, self.on_background_grace_over)
+
+    def on_background_grace_over(self):
+        if self.background and not any(core.is_running for core in self.timers):
+            self.leave_background()
+        return False
+
+    def enter_background(self):
+        # The window and everything it rendered is gone; the hold keeps the
+        # timers (and this process) alive until they stop
+        if not self.background:
+            self.background = True
+            self.hold()
+        if self.get_dbus_connection() is None:
+            return
+        self.scheduler.catch_up()
+        deadline = min(core.deadline for core in self.timers if core.is_running)
+        remaining = max(0, deadline - self.timers[0].clock.monotonic_time()) // 1000000
+        ends_at = GLib.DateTime.new_now_local().add_seconds(remaining)
+        notification = Gio.Notification.new("GTKetchup is running in the background")
+        notification.set_body(f"The timer ends at {ends_at.format('%H:%M')}.")
+        notification.set_default_action("app.show-window")
+        notification.set_priority(Gio.NotificationPriority.LOW)
+        self.send_notification("background", notification)
+
+    def leave_background(self):
+        if self.background:
+            self.background = False
+            self.withdraw_notification("background")
+            self.release()
+
+    def on_window_close_request(self, win):
+        if any(core.is_running for core in self.timers):
+            self.enter_background()
+        GLib.idle_add(self.on_window_closed_idle)
+        return False
+
+    def on_window_closed_idle(self):
+        if self.props.active_window is None:
+            from pomodoro import release_caches
+            release_caches()
+            # Widgets, layouts and surfaces may sit in reference cycles
+            gc.collect()
+            try:
+                # Hand the freed heap back to the system so it shows in RSS
+                ctypes.CDLL(None).malloc_trim(0)
+            except (OSError, AttributeError):
+                pass
+        return False
+
+    def on_background_action(self, action, param):
+        for win in self.get_windows():
+            win.close()
+
+    def on_timer_finished(self, core):
+        body = "Time is up!"
+        if core.is_running:
+            if core.phase == LONG_BREAK:
+                body = "Time for a long break!"
+            elif core.phase == SHORT_BREAK:
+                body = "Time for a short break!"
+            else:
+                body = "Break is over, back to work!"
+        self.notifier.notify("GTKetchup", body)
+
+    def on_start_action(self, action, param):
+        self.timer_core.start()
+
+    def on_pause_action(self, action, param):
+        self.timer_core.pause()
+
+    def on_reset_action(self, action, param):
+        self.timer_core.reset(self.config["default_time"] * 60)
+
+    def on_set_time_action(self, action, param):
+        self.timer_core.set_time(param.get_int32())
+
+    def on_query_remaining_action(self, action, param):
+        core = self.timer_core
+        core.scheduler.catch_up()
+        action.set_state(GLib.Variant("i", core.get_remaining(core.clock.monotonic_time())))
+
     def on_preferences_action(self, action, param):
         win = self.props.active_window
         if win:
-            pref_win = PreferencesWindow(win, self.config, transient_for=win)
+            from dialogs import PreferencesWindow
+            pref_win = PreferencesWindow(self.config, transient_for=win)
             pref_win.present()
-            
+
+    def on_statistics_action(self, action, param):
+        win = self.props.active_window
+        if win:
+            from dialogs import show_statistics
+            show_statistics(win, self.history)
+
     def on_tutorial_action(self, action, param):
         win = self.props.active_window
         if win:
@@ -163,54 +468,43 @@ class MyApp(Adw.Application):
     def on_about_action(self, action, param):
         win = self.props.active_window
         if win:
-            about = Adw.AboutWindow(
-                transient_for=win,
-                application_name="GTKetchup",
-                application_icon="com.github.geraldohomero.gtketchup",
-                developer_name="Geraldo Homero",
-                version="1.0.1",
-                comments="A native GNOME Pomodoro Timer with custom Cairo visuals, formerly known as Pomodoro Timer.",
-                website="https://github.com/geraldohomero/GTKetchup"
-            )
-            about.present()
+            from dialogs import show_about
+            show_about(win)
 
     def show_tutorial_if_needed(self, win, force_show=False):
         if self.config.get("show_tutorial", True) or force_show:
-            dialog = Adw.AlertDialog(heading="Welcome to GTKetchup!",
-                                     body="Here are a few tips to get started:\n\n"
-                                          "• Scroll your mouse or trackpad anywhere to adjust Minutes.\n"
-                                          "• Hold Shift + Scroll to adjust Seconds.\n"
-                                          "• Click the timer text in the center to input exact numbers.\n"
-                                          "• Click the play button at the bottom to start/pause.")
-            
-            dialog.add_response("ok", "Got it!")
-            dialog.set_default_response("ok")
-            dialog.set_close_response("ok")
-            
-            check_btn = Gtk.CheckButton(label="Do not show this again")
-            check_btn.set_active(not self.config.get("show_tutorial", True) and not force_show)
-            check_btn.set_margin_top(10)
-            check_btn.set_halign(Gtk.Align.CENTER)
-            
-            dialog.set_extra_child(check_btn)
-            
-            def on_dialog_response(dlg, response):
-                if check_btn.get_active():
-                    self.config["show_tutorial"] = False
-                else:
-                    self.config["show_tutorial"] = True
-                save_config(self.config)
-            
-            dialog.connect("response", on_dialog_response)
-            dialog.present(win)
+            from dialogs import show_tutorial
+            show_tutorial(win, self.config, force_show)
+
+    def on_first_frame(self, frame_clock):
+        frame_clock.disconnect_by_func(self.on_first_frame)
+        self.profile.mark("first on_draw")
+        self.profile.report()
+
+    def on_window_realize(self, win):
+        win.get_frame_clock().connect("after-paint", self.on_first_frame)
 
     def do_activate(self):
+        self.config.run_when_loaded(self.present_window)
+
+    def present_window(self):
         win = self.props.active_window
         if not win:
-            win = PomodoroWindow(self.config, application=self)
-            self.show_tutorial_if_needed(win)
+            win = PomodoroWindow(self.config, self.timers, application=self)
+            win.connect("close-request", self.on_window_close_request)
+            if self.profile:
+                self.profile.mark("window")
+                win.connect("realize", self.on_window_realize)
+            # Keep the tutorial (and the dialogs import) out of the first frame
+            GLib.idle_add(self.on_show_tutorial_idle, win)
+            GLib.idle_add(self.notifier.preload, priority=GLib.PRIORITY_LOW)
+        self.leave_background()
         win.present()
 
+    def on_show_tutorial_idle(self, win):
+        self.show_tutorial_if_needed(win)
+        return False
+
 def main():
     app = MyApp()
     return app.run(sys.argv)
@@ -0,0 +1,66 @@
+import os
+import gi
+
+gi.require_version('Gtk', '4.0')
+
+from gi.repository import Gtk, Gio, GLib
+
+SOUND_PATH = "/usr/share/sounds/freedesktop/stereo/complete.oga"
+
+
+class FinishNotifier:
+    """Desktop notification and sound for a finished timer.
+
+    Notifications go through Application.send_notification() and the sound
+    through a preloaded Gtk.MediaFile, both without blocking the main loop.
+    notify-send/paplay are only spawned when those are unavailable, and the
+    children are reaped asynchronously.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.media = None
+        self.pending_subprocesses = set()
+
+    def preload(self):
+        # Decode once up front; replays only seek back to the start
+        if self.media is None and os.path.exists(SOUND_PATH):
+            self.media = Gtk.MediaFile.new_for_filename(SOUND_PATH)
+        return False
+
+    def notify(self, title, body):
+        if self.app.get_dbus_connection() is not None:
+            notification = Gio.Notification.new(title)
+            notification.set_body(body)
+            notification.set_icon(Gio.ThemedIcon.new("appointment-soon"))
+            notification.set_priority(Gio.NotificationPriority.HIGH)
+            self.app.send_notification("timer-finished", notification)
+        else:
+            self._spawn(['notify-send', '-i', 'appointment-soon', title, body])
+        self.play_sound()
+
+    def play_sound(self):
+        self.preload()
+        media = self.media
+        if media is not None and media.get_error() is None:
+            if media.get_ended():
+                media.seek(0)
+            media.play()
+        else:
+            self._spawn(['paplay', SOUND_PATH])
+
+    def _spawn(self, argv):
+        try:
+            proc = Gio.Subprocess.new(argv, Gio.SubprocessFlags.NONE)
+        except GLib.Error as e:
+            print("Failed to dispatch notification/sound:", e.message)
+            return
+        self.pending_subprocesses.add(proc)
+        proc.wait_async(None, self._on_subprocess_exited)
+
+    def _on_subprocess_exited(self, proc, result):
+        try:
+            proc.wait_finish(result)
+        except GLib.Error:
+            pass
+        self.pending_subprocesses.discard(proc)
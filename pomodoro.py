@@ -1,40 +1,417 @@
 import math
+import os
+import sys
 import gi
-import subprocess
+from array import array
 
 gi.require_version('Gtk', '4.0')
+gi.require_version('Gsk', '4.0')
+gi.require_version('Graphene', '1.0')
 gi.require_version('Adw', '1')
 
-from gi.repository import Gtk, Gdk, GLib, Pango, PangoCairo
+from gi.repository import Gtk, Gdk, Gsk, Graphene, GLib, Pango, PangoCairo
 import cairo
 
-class PomodoroTimer(Gtk.DrawingArea):
-    def __init__(self, config):
+from timer_core import USEC_PER_SEC, TimerCore, get_ring_state
+
+# Layers of the dial, bottom to top. Each one is its own child widget with
+# its own render node, so a change only repaints (and damages) that part.
+LAYERS = ("face", "ring", "sweep", "digits", "buttons")
+
+# Pre-rendered static layers, shared by every timer in the process so that
+# N identical dials cost one surface per layer and state, not N.
+_static_layer_cache = {}
+
+NUM_DOTS = 60
+
+# Dot centers relative to the dial center, per ring radius:
+# {dot_radius: (xs, ys)} with one array('d') per axis.
+_dot_geometry_cache = {}
+
+def get_dot_geometry(dot_radius):
+    geometry = _dot_geometry_cache.get(dot_radius)
+    if geometry is None:
+        xs = array('d')
+        ys = array('d')
+        for i in range(NUM_DOTS):
+            angle = -math.pi / 2 + (i * 2 * math.pi / NUM_DOTS)
+            xs.append(math.cos(angle) * dot_radius)
+            ys.append(math.sin(angle) * dot_radius)
+        # Only the current size matters; drop the rest
+        _dot_geometry_cache.clear()
+        geometry = _dot_geometry_cache[dot_radius] = (xs, ys)
+    return geometry
+
+# Cell size of the hit-test grid, in pixels
+HIT_CELL = 32
+
+class DialLayout:
+    """Geometry of the dial for one widget size.
+
+    Computed once per size and shared by drawing and input handling.
+    ``regions`` lists the clickable areas in priority order as
+    ``(name, shape)``, where shape is ``("circle", x, y, radius)`` or
+    ``("rect", x0, y0, x1, y1)``; ``cells`` buckets them into a coarse
+    grid so a pointer position only tests the one or two regions that
+    can contain it.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cx = cx = width / 2
+        self.cy = cy = height / 2
+        self.radius = radius = min(width, height) / 2 - 20
+        self.dot_radius = radius - 30
+        self.sweep_radius = radius - 44
+
+        self.play = (cx, cy + radius * 0.65)
+        self.reset = (cx - radius * 0.4, self.play[1])
+        self.zero = (cx + radius * 0.4, self.play[1])
+        button_x = radius * 0.4 + 20
+
+        # Bounding boxes in widget coordinates; the digits band spans the
+        # full width because long times may overflow the ring.
+        self.layer_rects = {
+            "face": (cx - radius - 5, cy - radius - 5, 2 * radius + 10, 2 * radius + 10),
+            "ring": (cx - radius + 20, cy - radius + 20, 2 * radius - 40, 2 * radius - 40),
+            "digits": (0, cy - 120, width, 210),
+            "buttons": (cx - button_x, self.play[1] - 20, 2 * button_x, 40),
+        }
+
+        # Same order as the old cascade of checks in on_click
+        self.regions = [
+            ("text", ("circle", cx, cy, radius * 0.4)),
+            ("play", ("circle", self.play[0], self.play[1], 40)),
+            ("reset", ("circle", self.reset[0], self.reset[1], 30)),
+            ("zero", ("circle", self.zero[0], self.zero[1], 30)),
+            ("minus", ("rect", 0, 0, cx - radius * 0.5, cy + radius * 0.4)),
+            ("plus", ("rect", cx + radius * 0.5, 0, width, cy + radius * 0.4)),
+        ]
+        self.cells = {}
+        for index, (name, shape) in enumerate(self.regions):
+            if shape[0] == "circle":
+                _, x, y, r = shape
+                x0, y0, x1, y1 = x - r, y - r, x + r, y + r
+            else:
+                _, x0, y0, x1, y1 = shape
+            for i in range(max(0, int(x0 // HIT_CELL)), int(x1 // HIT_CELL) + 1):
+                for j in range(max(0, int(y0 // HIT_CELL)), int(y1 // HIT_CELL) + 1):
+                    self.cells.setdefault((i, j), []).append(index)
+
+    def hit_test(self, x, y):
+        for index in self.cells.get((int(x // HIT_CELL), int(y // HIT_CELL)), ()):
+            name, shape = self.regions[index]
+            if shape[0] == "circle":
+                dx = x - shape[1]
+                dy = y - shape[2]
+                if dx * dx + dy * dy < shape[3] * shape[3]:
+                    return name
+            elif shape[1] <= x < shape[3] and shape[2] <= y < shape[4]:
+                return name
+        return None
+
+    def sweep_center(self, angle):
+        return (self.cx + math.cos(angle) * self.sweep_radius,
+                self.cy + math.sin(angle) * self.sweep_radius)
+
+# Regions that only do something while the timer is stopped
+STOPPED_ONLY_REGIONS = ("text", "reset", "zero", "minus", "plus")
+
+# Countdown digits pre-rendered once per (font, scale), shared by every
+# timer: {(font, scale): DigitAtlas}
+_digit_atlas_cache = {}
+ATLAS_PADDING = 2
+
+class DigitAtlas:
+    """One surface holding the glyphs the countdown text can contain.
+
+    Digits get a common advance (the widest digit), so the text keeps its
+    width and position from one second to the next. Text with any other
+    character must be drawn with Pango; see covers(). The atlas is rendered
+    right away and keeps no reference to the layouts (or the widget) it
+    was built from, since it is shared by every timer.
+    """
+
+    CHARS = "0123456789: "
+
+    def __init__(self, layout_for, scale):
+        layouts = {ch: layout_for(ch) for ch in self.CHARS}
+        sizes = {ch: layout.get_pixel_size() for ch, layout in layouts.items()}
+        digit_width = max(sizes[d][0] for d in "0123456789")
+        self.scale = scale
+        self.height = max(h for w, h in sizes.values())
+        self.advances = {ch: digit_width if ch.isdigit() else sizes[ch][0] for ch in self.CHARS}
+        # Where each glyph sits inside its cell (centered)
+        self.insets = {ch: (self.advances[ch] - sizes[ch][0]) / 2 for ch in self.CHARS}
+        self.offsets = {}
+        x = ATLAS_PADDING
+        for ch in self.CHARS:
+            self.offsets[ch] = x
+            x += self.advances[ch] + 2 * ATLAS_PADDING
+        self.width = x
+        self.surface = self._render(layouts)
+
+    def _render(self, layouts):
+        scale = self.scale
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, int(math.ceil(self.width * scale)),
+                                     int(math.ceil(self.height * scale)))
+        surface.set_device_scale(scale, scale)
+        cr = cairo.Context(surface)
+        cr.set_source_rgb(1, 1, 1)
+        for ch in self.CHARS:
+            layout = layouts[ch]
+            PangoCairo.update_layout(cr, layout)
+            cr.move_to(self.offsets[ch] + self.insets[ch], 0)
+            PangoCairo.show_layout(cr, layout)
+        surface.flush()
+        return surface
+
+    def covers(self, text):
+        return all(ch in self.advances for ch in text)
+
+    def get_pixel_size(self, text):
+        return sum(self.advances[ch] for ch in text), self.height
+
+    def show(self, cr, text, x, y):
+        # Snap to device pixels so the glyphs are copied, not resampled
+        x = round(x * self.scale) / self.scale
+        y = round(y * self.scale) / self.scale
+        for ch in text:
+            advance = self.advances[ch]
+            if ch != " ":
+                cr.set_source_surface(self.surface, x - self.offsets[ch], y)
+                cr.rectangle(x, y, advance, self.height)
+                cr.fill()
+            x += advance
+
+# Render nodes of the static layers for the snapshot renderer, shared like
+# the cairo surfaces: {(name, width, height, state): node}. Nodes do not
+# depend on the scale factor.
+_static_node_cache = {}
+
+# Text nodes do not depend on the size either, so they are kept apart and
+# survive resizes: {(font, text, gray): node}
+_text_node_cache = {}
+
+# Which renderer new dials use: "cairo" (DrawingArea layers) or "gsk"
+# (render nodes from do_snapshot); switched live with the "renderer" setting
+RENDERERS = ("cairo", "gsk")
+
+def release_caches():
+    # Called once the last dial is gone (background mode); everything here
+    # is rebuilt on demand by the next window
+    _static_layer_cache.clear()
+    _static_node_cache.clear()
+    _text_node_cache.clear()
+    _dot_geometry_cache.clear()
+    _digit_atlas_cache.clear()
+
+def _rgba(r, g, b, a=1.0):
+    color = Gdk.RGBA()
+    color.red, color.green, color.blue, color.alpha = r, g, b, a
+    return color
+
+def _rect(x, y, width, height):
+    return Graphene.Rect().init(x, y, width, height)
+
+def _circle(x, y, radius):
+    return Gsk.RoundedRect().init_from_rect(_rect(x - radius, y - radius, 2 * radius, 2 * radius), radius)
+
+def _append_circle(snapshot, x, y, radius, color):
+    snapshot.push_rounded_clip(_circle(x, y, radius))
+    snapshot.append_color(color, _rect(x - radius, y - radius, 2 * radius, 2 * radius))
+    snapshot.pop()
+
+class SnapshotLayer(Gtk.Widget):
+    """Dial layer that emits render nodes instead of running a draw func."""
+
+    def __init__(self, snapshot_func, name):
+        super().__init__()
+        self.snapshot_func = snapshot_func
+        self.name = name
+
+    def do_snapshot(self, snapshot):
+        self.snapshot_func(self, snapshot, self.name)
+
+# Animated mode: eased transitions when the time is changed by hand
+TRANSITION_US = 250000
+SWEEP_SIZE = 14
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+# Scrolling: touchpads in surface units move this many pixels per step.
+# Kinetic scrolling decays with this friction (1/s) until it is slower
+# than the minimum velocity (steps/s).
+SCROLL_PIXELS_PER_STEP = 30
+KINETIC_FRICTION = 4.0
+KINETIC_MIN_VELOCITY = 0.5
+
+# Prepared at low priority after the first frame, so no later state change
+# pays for shaping or rendering them: one countdown per digits view (MM SS,
+# MMM SS, HH:MM :SS), the fonts those use, and every state of the buttons.
+WARM_UP_SECONDS = (25 * 60, 100 * 60, 3600)
+DIGIT_FONTS = ("Sans Bold 80", "Sans Bold 60", "Sans Bold 70", "Sans Bold 15")
+BUTTON_STATES = ((False, None), (False, "play"), (False, "reset"), (False, "zero"),
+                 (True, None), (True, "play"))
+
+# GTKETCHUP_FRAME_LOG=1 logs the duration of every real frame (update, layout,
+# paint) and the interval since the previous one to stderr.
+FRAME_LOG_ENABLED = bool(os.environ.get("GTKETCHUP_FRAME_LOG"))
+FRAME_LOG_SUMMARY_EVERY = 60
+
+class FrameTimeLog:
+    def __init__(self, frame_clock, label):
+        self.label = label
+        self.frames = 0
+        self.durations = []
+        self._paint_start = 0
+        self._last_frame_time = 0
+        self._handlers = [
+            frame_clock.connect("before-paint", self.on_before_paint),
+            frame_clock.connect("after-paint", self.on_after_paint),
+        ]
+        self.frame_clock = frame_clock
+
+    def disconnect(self):
+        for handler_id in self._handlers:
+            self.frame_clock.disconnect(handler_id)
+        self._handlers = []
+
+    def on_before_paint(self, frame_clock):
+        self._paint_start = GLib.get_monotonic_time()
+
+    def on_after_paint(self, frame_clock):
+        duration = (GLib.get_monotonic_time() - self._paint_start) / 1000
+        frame_time = frame_clock.get_frame_time()
+        interval = (frame_time - self._last_frame_time) / 1000 if self._last_frame_time else 0.0
+        self._last_frame_time = frame_time
+        self.frames += 1
+        self.durations.append(duration)
+        print(f"[{self.label}] frame {self.frames}: {duration:.2f} ms (interval {interval:.1f} ms)", file=sys.stderr)
+
+        if len(self.durations) >= FRAME_LOG_SUMMARY_EVERY:
+            durations = sorted(self.durations)
+            p95 = durations[int(len(durations) * 0.95) - 1]
+            print(f"[{self.label}] last {len(durations)} frames: mean {sum(durations) / len(durations):.2f} ms, "
+                  f"p95 {p95:.2f} ms, max {durations[-1]:.2f} ms", file=sys.stderr)
+            self.durations = []
+
+class PomodoroTimer(Gtk.Widget):
+    def __init__(self, config, core=None):
         super().__init__()
         self.set_size_request(400, 400)
         self.set_hexpand(True)
         self.set_vexpand(True)
         
+        # All timer state lives in the core; this widget only renders it
+        self.core = core or TimerCore(config["default_time"] * 60)
         self.config = config
-        self.apply_config(self.config)
-        self.initial_time_seconds = self.time_seconds
-        
-        self.is_running = False
-        self.timer_source = None
         
         self.scroll_accumulator = 0.0
+        # Scroll deltas are collected here and applied once per frame, in
+        # on_scroll_frame(); keyed on whether Shift (seconds) was held
+        self._scroll_pending = {False: 0.0, True: 0.0}
+        self._scroll_shift = False
+        self._scroll_tick_id = None
+        self._scroll_frame_time = 0
+        self._kinetic_velocity = 0.0
+
+        # Last rendered state of each dynamic layer, used to decide which
+        # layers a core change actually invalidates.
+        self._ring_state = None
+        self._digits_state = None
+        self._buttons_state = None
+
+        # Seconds currently shown by the dial. Equal to core.time_seconds,
+        # except while an eased transition is running in animated mode.
+        self._shown_seconds = self.core.time_seconds
+        self._transition = None
 
-        self.set_draw_func(self.on_draw)
+        # Animated mode runs a frame-clock tick callback only while the
+        # window is mapped, focused and not suspended (minimized/hidden).
+        # Unfocused it falls back to the core's 1 Hz updates; hidden, no
+        # animation work is done at all.
+        self._tick_id = None
+        self._window = None
+        self._window_handlers = []
+        self._app = None
+        self._app_handler = None
+        self._sweep_angle = None
 
-        # Scroll event
-        scroll = Gtk.EventControllerScroll.new(Gtk.EventControllerScrollFlags.VERTICAL | Gtk.EventControllerScrollFlags.DISCRETE)
+        # Pango objects reused across frames. Constant labels are keyed on
+        # (font, text) and shaped once; changing text (the digits) gets one
+        # layout per font that is updated in place with set_text().
+        self._font_cache = {}
+        self._layout_cache = {}
+        self._text_layouts = {}
+        self.layout_cache_hits = 0
+        self.layout_cache_misses = 0
+        self._font_handler = None
+        # The countdown digits come from a DigitAtlas unless disabled here
+        # or the text needs anything the atlas does not have
+        self.use_digit_atlas = True
+
+        self.dial = None
+        self.hover = None
+
+        # Fonts, layouts, atlases, surfaces and nodes created while drawing a
+        # frame rather than by the warm-up (see queue_warm_up()); each one is
+        # a jank event, counted here and logged with GTKETCHUP_FRAME_LOG
+        self.jank_events = 0
+        self._warming = False
+        self._warm_up = None
+        self._warm_up_source = None
+        self._warm_up_handler = None
+        self._warmed_size = None
+
+        self._layer_rects = {}
+        self._layer_painters = {
+            "face": self._draw_face,
+            "ring": self._draw_ring,
+            "sweep": self._draw_sweep,
+            "digits": self._draw_digits,
+            "buttons": self._draw_buttons,
+        }
+        self._layer_snapshots = {
+            "face": self._snapshot_face,
+            "ring": self._snapshot_ring,
+            "sweep": self._snapshot_sweep,
+            "digits": self._snapshot_digits,
+            "buttons": self._snapshot_buttons,
+        }
+        self._ring_node = None
+        self.popover = None
+        self.layers = {}
+        self.renderer = None
+        renderer = os.environ.get("GTKETCHUP_RENDERER") or config.get("renderer", "cairo")
+        self.set_renderer(renderer if renderer in RENDERERS else "cairo")
+
+        self.connect("notify::scale-factor", self.on_scale_factor_changed)
+        self.connect("realize", self.on_realize)
+        self.connect("unrealize", self.on_unrealize)
+        self.connect("map", self.on_map)
+        self.connect("unmap", self.on_unmap)
+
+        # Scroll event; smooth deltas, so high resolution wheels and
+        # touchpads (including their inertia) work in fractions of a step
+        scroll = Gtk.EventControllerScroll.new(Gtk.EventControllerScrollFlags.VERTICAL | Gtk.EventControllerScrollFlags.KINETIC)
+        scroll.connect('scroll-begin', self.on_scroll_begin)
         scroll.connect('scroll', self.on_scroll)
+        scroll.connect('decelerate', self.on_scroll_decelerate)
         self.add_controller(scroll)
 
         # Click event
         click = Gtk.GestureClick.new()
         click.connect('pressed', self.on_click)
         self.add_controller(click)
+
+        # Hover feedback; each motion event is one grid lookup
+        motion = Gtk.EventControllerMotion.new()
+        motion.connect('motion', self.on_motion)
+        motion.connect('leave', self.on_leave)
+        self.add_controller(motion)
         
         # Popover for manual adjustment
         self.popover = Gtk.Popover()
@@ -46,166 +423,576 @@ class PomodoroTimer(Gtk.DrawingArea):
         box.set_margin_end(10)
 
         self.min_spin = Gtk.SpinButton.new_with_range(0, 999, 1)
-        self.min_spin.set_value(self.time_seconds // 60)
+        self.min_spin.set_value(self.core.time_seconds // 60)
         self.min_spin.connect("value-changed", self.on_spin_changed)
         box.append(Gtk.Label(label="Min:"))
         box.append(self.min_spin)
 
         self.sec_spin = Gtk.SpinButton.new_with_range(0, 59, 1)
-        self.sec_spin.set_value(self.time_seconds % 60)
+        self.sec_spin.set_value(self.core.time_seconds % 60)
         self.sec_spin.connect("value-changed", self.on_spin_changed)
         box.append(Gtk.Label(label="Sec:"))
         box.append(self.sec_spin)
         
         self.popover.set_child(box)
         self.popover.set_parent(self)
-        
-    def apply_config(self, config):
-        self.config = config
-        self.time_seconds = self.config["default_time"] * 60
-        self.initial_time_seconds = self.time_seconds
+
+        self._core_handlers = [
+            self.core.connect("changed", self.on_core_changed),
+            self.core.connect("state-changed", self.on_core_state_changed),
+        ]
+
+        # Each setting only touches what depends on it; the timer's own
+        # time is left alone (the application applies default_time)
+        self._config_handlers = [
+            self.config.connect_changed("scroll_min_step", self.on_scroll_step_changed),
+            self.config.connect_changed("scroll_sec_step", self.on_scroll_step_changed),
+            self.config.connect_changed("animations", self.on_animations_changed),
+            self.config.connect_changed("renderer", self.on_renderer_changed),
+        ]
+        self.on_scroll_step_changed(None)
+        self.on_animations_changed(None)
+
+    def set_renderer(self, renderer):
+        # Swaps the layer widgets; everything they draw is derived from the
+        # core and the dial layout, so nothing else has to change
+        if renderer == self.renderer:
+            return
+        self.renderer = renderer
+        for layer in self.layers.values():
+            layer.unparent()
+        self.layers = {}
+        for name in LAYERS:
+            if renderer == "gsk":
+                layer = SnapshotLayer(self.on_layer_snapshot, name)
+            else:
+                layer = Gtk.DrawingArea()
+                layer.set_draw_func(self.on_layer_draw, name)
+            layer.set_can_target(False)
+            layer.insert_before(self, self.popover)
+            self.layers[name] = layer
+        if "animations" in self.config:
+            self.layers["sweep"].set_visible(self.config.get("animations", False))
+        self.queue_allocate()
+        self.queue_warm_up()
+
+    def on_renderer_changed(self, key):
+        renderer = self.config.get("renderer", "cairo")
+        self.set_renderer(renderer if renderer in RENDERERS else "cairo")
+
+    def on_scroll_step_changed(self, key):
         self.scroll_min_step = self.config["scroll_min_step"]
         self.scroll_sec_step = self.config["scroll_sec_step"]
-        if hasattr(self, 'queue_draw'):
-            self.queue_draw()
+
+    def on_animations_changed(self, key):
+        self.layers["sweep"].set_visible(self.config.get("animations", False))
+        self.update_sweep(self.core.clock.monotonic_time())
+        self.update_animation_clock()
+
+    def on_core_changed(self, core):
+        if not core.is_running and self._can_animate() and core.time_seconds != self._shown_seconds:
+            self._transition = [self._shown_seconds, core.time_seconds, None]
+            self.update_animation_clock()
+        else:
+            self._transition = None
+            self._shown_seconds = core.time_seconds
+        self.update_sweep(core.clock.monotonic_time())
+        self.update_damage()
+
+    def on_core_state_changed(self, core):
+        self.popover.popdown()
+        if core.is_running and self.hover in STOPPED_ONLY_REGIONS:
+            self.set_hover(None)
+        self.update_sweep(core.clock.monotonic_time())
+        self.update_damage()
+        self.update_animation_clock()
+
+    def on_map(self, widget):
+        self._window = self.get_root()
+        self._window_handlers = [
+            self._window.connect("notify::is-active", self.on_window_state_changed),
+            self._window.connect("notify::suspended", self.on_window_state_changed),
+        ]
+        self._app = self._window.get_application() if isinstance(self._window, Gtk.Window) else None
+        if self._app is not None:
+            self._app_handler = self._app.connect("notify::screensaver-active", self.on_window_state_changed)
+        self.update_visibility()
+
+    def on_unmap(self, widget):
+        for handler_id in self._window_handlers:
+            self._window.disconnect(handler_id)
+        self._window_handlers = []
+        self._window = None
+        if self._app_handler is not None:
+            self._app.disconnect(self._app_handler)
+            self._app_handler = None
+        self._app = None
+        self.update_visibility()
+
+    def on_window_state_changed(self, obj, pspec):
+        self.update_visibility()
+
+    def update_visibility(self):
+        # Per-second ticks are only worth a wakeup when someone can see them;
+        # otherwise the core just wakes up once, at its deadline.
+        window = self._window
+        visible = (window is not None and not window.is_suspended()
+                   and not (self._app is not None and self._app.props.screensaver_active))
+        self.core.set_ticking(visible)
+        if visible:
+            self.update_sweep(self.core.clock.monotonic_time())
+        self.update_animation_clock()
+
+    def _can_animate(self):
+        window = self._window
+        return (self.config.get("animations", False) and window is not None
+                and window.is_active() and not window.is_suspended())
+
+    def update_animation_clock(self):
+        wanted = self._can_animate() and (self.core.is_running or self._transition is not None)
+        if wanted and self._tick_id is None:
+            self._tick_id = self.add_tick_callback(self.on_frame_tick)
+        elif not wanted and self._tick_id is not None:
+            self.remove_tick_callback(self._tick_id)
+            self._tick_id = None
+        if not wanted and self._transition is not None:
+            # Nobody will see the rest of the transition; jump to the end
+            self._shown_seconds = self._transition[1]
+            self._transition = None
+            self.update_damage()
+
+    def on_frame_tick(self, widget, frame_clock):
+        now = frame_clock.get_frame_time()
+        transition = self._transition
+        if transition is not None:
+            start, end, start_time = transition
+            if start_time is None:
+                start_time = transition[2] = now
+            t = min(1.0, (now - start_time) / TRANSITION_US)
+            self._shown_seconds = int(round(start + (end - start) * ease_out_cubic(t)))
+            if t >= 1.0:
+                self._transition = None
+        self.update_sweep(now)
+        self.update_damage()
+
+        if not self.core.is_running and self._transition is None:
+            self._tick_id = None
+            return GLib.SOURCE_REMOVE
+        return GLib.SOURCE_CONTINUE
+
+    def update_sweep(self, now):
+        # Sweeping seconds indicator: one turn per minute of remaining time
+        angle = None
+        if self.core.is_running and self.config.get("animations", False):
+            remaining_us = max(0, self.core.deadline - now)
+            angle = -math.pi / 2 + 2 * math.pi * (remaining_us % (60 * USEC_PER_SEC)) / (60 * USEC_PER_SEC)
+        if angle != self._sweep_angle:
+            self._sweep_angle = angle
+            # Only the small sweep layer moves; nothing else is redrawn
+            self.queue_allocate()
+
+    def update_damage(self):
+        core = self.core
+        ring_state = get_ring_state(self._shown_seconds, core.is_running)
+        if ring_state != self._ring_state:
+            self._ring_state = ring_state
+            self.layers["ring"].queue_draw()
+        if self._shown_seconds != self._digits_state:
+            self._digits_state = self._shown_seconds
+            self.layers["digits"].queue_draw()
+        if core.is_running != self._buttons_state:
+            self._buttons_state = core.is_running
+            self.layers["buttons"].queue_draw()
+
+    def queue_full_draw(self):
+        for layer in self.layers.values():
+            layer.queue_draw()
+
+    def do_measure(self, orientation, for_size):
+        return 0, 0, -1, -1
+
+    def get_dial(self, width, height):
+        # Rebuilt only when the size changes (allocation or an offscreen
+        # render at another size)
+        dial = self.dial
+        if dial is None or dial.width != width or dial.height != height:
+            dial = self.dial = DialLayout(width, height)
+        return dial
+
+    def _get_sweep_rect(self, dial):
+        angle = self._sweep_angle if self._sweep_angle is not None else -math.pi / 2
+        x, y = dial.sweep_center(angle)
+        return (x - SWEEP_SIZE / 2, y - SWEEP_SIZE / 2, SWEEP_SIZE, SWEEP_SIZE)
+
+    def do_size_allocate(self, width, height, baseline):
+        dial = self.get_dial(width, height)
+        for name, layer in self.layers.items():
+            if not layer.get_visible():
+                continue
+            if name == "sweep":
+                rx, ry, rw, rh = self._get_sweep_rect(dial)
+            else:
+                rx, ry, rw, rh = dial.layer_rects[name]
+            rect = Gdk.Rectangle()
+            rect.x = int(math.floor(rx))
+            rect.y = int(math.floor(ry))
+            rect.width = max(1, int(math.ceil(rx + rw)) - rect.x)
+            rect.height = max(1, int(math.ceil(ry + rh)) - rect.y)
+            self._layer_rects[name] = rect
+            layer.size_allocate(rect, -1)
+
+        self.popover.present()
+        # Static layers and nodes are per size
+        if (width, height) != self._warmed_size:
+            self.queue_warm_up()
+
+    def do_dispose(self):
+        if self._tick_id is not None:
+            self.remove_tick_callback(self._tick_id)
+            self._tick_id = None
+        if self._scroll_tick_id is not None:
+            self.remove_tick_callback(self._scroll_tick_id)
+            self._scroll_tick_id = None
+        self.cancel_warm_up()
+        # Nobody is showing this core any more; only its deadline matters
+        self.core.set_ticking(False)
+        for handler_id in self._core_handlers:
+            self.core.disconnect(handler_id)
+        self._core_handlers = []
+        for handler_id in self._config_handlers:
+            self.config.disconnect(handler_id)
+        self._config_handlers = []
+        for layer in self.layers.values():
+            layer.unparent()
+        self.layers = {}
+        if self.popover is not None:
+            self.popover.unparent()
+            self.popover = None
+        Gtk.Widget.do_dispose(self)
+
+    def on_realize(self, widget):
+        self._font_handler = self.get_settings().connect("notify::gtk-font-name", self.on_font_changed)
+        self.queue_warm_up()
+
+    def on_unrealize(self, widget):
+        if self._font_handler:
+            self.get_settings().disconnect(self._font_handler)
+            self._font_handler = None
+        self.cancel_warm_up()
+
+    def on_scale_factor_changed(self, widget, pspec):
+        self.flush_layout_cache()
+        self.queue_full_draw()
+        self.queue_warm_up()
+
+    def on_font_changed(self, settings, pspec):
+        self.flush_layout_cache()
+        self.queue_full_draw()
+        self.queue_warm_up()
+
+    def queue_warm_up(self):
+        # Runs once the next frame has been presented, in low priority idle
+        # steps, so it never delays a frame or input
+        self._warm_up = None
+        if self._warm_up_handler is None and self._warm_up_source is None and self.get_realized():
+            self._warm_up_handler = self.get_frame_clock().connect("after-paint", self.on_warm_up_after_paint)
+
+    def cancel_warm_up(self):
+        if self._warm_up_handler is not None:
+            self.get_frame_clock().disconnect(self._warm_up_handler)
+            self._warm_up_handler = None
+        if self._warm_up_source is not None:
+            GLib.source_remove(self._warm_up_source)
+            self._warm_up_source = None
+        self._warm_up = None
+
+    def on_warm_up_after_paint(self, frame_clock):
+        frame_clock.disconnect(self._warm_up_handler)
+        self._warm_up_handler = None
+        self._warm_up_source = GLib.idle_add(self.on_warm_up_idle, priority=GLib.PRIORITY_LOW)
+
+    def on_warm_up_idle(self):
+        if self._warm_up is None:
+            self._warm_up = self._warm_up_steps(self.get_width(), self.get_height())
+        self._warming = True
+        try:
+            next(self._warm_up)
+            return GLib.SOURCE_CONTINUE
+        except StopIteration:
+            self._warm_up = None
+            self._warm_up_source = None
+            return GLib.SOURCE_REMOVE
+        finally:
+            self._warming = False
+
+    def _warm_up_steps(self, width, height):
+        # One small piece of work per idle call
+        if width <= 0 or height <= 0:
+            return
+        self._warmed_size = (width, height)
+        scale = self.get_scale_factor()
+        surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, 1, 1)
+        surface.set_device_scale(scale, scale)
+        scratch = cairo.Context(surface)
+
+        # Every digits view once, through the same path a frame takes
+        for seconds in WARM_UP_SECONDS:
+            shown = self._shown_seconds
+            self._shown_seconds = seconds
+            try:
+                if self.renderer == "gsk":
+                    self._snapshot_digits(Gtk.Snapshot(), width, height)
+                else:
+                    self._draw_digits(scratch, width, height)
+            finally:
+                self._shown_seconds = shown
+            yield
+
+        # Glyphs those texts did not contain
+        if self.use_digit_atlas:
+            for font in DIGIT_FONTS:
+                if self.renderer == "gsk":
+                    for ch in DigitAtlas.CHARS.replace(" ", ""):
+                        self._get_text_node(font, ch, 1.0)
+                else:
+                    self._get_digit_atlas(font, scale)
+                yield
+
+        # The face and every state the buttons can be drawn in
+        if self.renderer == "gsk":
+            self._snapshot_face(Gtk.Snapshot(), width, height)
+        else:
+            self._get_static_layer("face", self._render_face, width, height,
+                                   self.get_dial(width, height).layer_rects["face"])
+        yield
+        for state in BUTTON_STATES:
+            if self.renderer == "gsk":
+                self._snapshot_buttons(Gtk.Snapshot(), width, height, state)
+            else:
+                self._get_buttons_layer(width, height, state)
+            yield
+
+    def _note_first_use(self, kind, key):
+        if self._warming:
+            return
+        self.jank_events += 1
+        if FRAME_LOG_ENABLED:
+            print(f"[GTKetchup] first use while drawing: {kind} {key!r}", file=sys.stderr)
+
+    def flush_layout_cache(self):
+        self._font_cache.clear()
+        self._layout_cache.clear()
+        self._text_layouts.clear()
+        # The static layers, nodes and digit atlases contain shaped text too
+        _static_layer_cache.clear()
+        _static_node_cache.clear()
+        _text_node_cache.clear()
+        _digit_atlas_cache.clear()
+        self._ring_node = None
+
+    def layout_cache_hit_rate(self):
+        total = self.layout_cache_hits + self.layout_cache_misses
+        return self.layout_cache_hits / total if total else 0.0
+
+    def _get_font(self, font):
+        desc = self._font_cache.get(font)
+        if desc is None:
+            desc = Pango.FontDescription(font)
+            self._font_cache[font] = desc
+        return desc
+
+    def _get_layout(self, font, text):
+        key = (font, text)
+        layout = self._layout_cache.get(key)
+        if layout is None:
+            self.layout_cache_misses += 1
+            self._note_first_use("layout", key)
+            layout = self.create_pango_layout(text)
+            layout.set_font_description(self._get_font(font))
+            self._layout_cache[key] = layout
+        else:
+            self.layout_cache_hits += 1
+        return layout
+
+    def _get_text_layout(self, font, text):
+        layout = self._text_layouts.get(font)
+        if layout is None:
+            self.layout_cache_misses += 1
+            self._note_first_use("text layout", font)
+            layout = self.create_pango_layout(text)
+            layout.set_font_description(self._get_font(font))
+            self._text_layouts[font] = layout
+        else:
+            self.layout_cache_hits += 1
+            if layout.get_text() != text:
+                layout.set_text(text, -1)
+        return layout
+
+    def _get_digit_text(self, cr, font, text):
+        # Returns (width, height, source) where source is a DigitAtlas or a
+        # Pango layout, to be drawn with _show_digit_text()
+        if self.use_digit_atlas:
+            # Not the target's device scale: a DrawingArea draws into a
+            # recording surface that always reports 1
+            atlas = self._get_digit_atlas(font, self.get_scale_factor())
+            if atlas.covers(text):
+                return atlas.get_pixel_size(text) + (atlas,)
+        layout = self._get_text_layout(font, text)
+        PangoCairo.update_layout(cr, layout)
+        return layout.get_pixel_size() + (layout,)
+
+    def _get_digit_atlas(self, font, scale):
+        key = (font, scale)
+        atlas = _digit_atlas_cache.get(key)
+        if atlas is None:
+            self._note_first_use("digit atlas", key)
+            atlas = _digit_atlas_cache[key] = DigitAtlas(lambda ch: self._get_layout(font, ch), scale)
+        return atlas
+
+    def _show_digit_text(self, cr, source, text, x, y):
+        if isinstance(source, DigitAtlas):
+            source.show(cr, text, x, y)
+        else:
+            cr.move_to(x, y)
+            PangoCairo.show_layout(cr, source)
 
     def on_spin_changed(self, spin):
         minutes = self.min_spin.get_value_as_int()
         seconds = self.sec_spin.get_value_as_int()
-        self.time_seconds = minutes * 60 + seconds
-        self.initial_time_seconds = self.time_seconds
-        self.queue_draw()
+        self.core.set_time(minutes * 60 + seconds)
+
+    def _scroll_steps(self, controller, delta):
+        # Touchpads report pixels, wheels report (possibly fractional) detents
+        if hasattr(controller, "get_unit") and controller.get_unit() == Gdk.ScrollUnit.SURFACE:
+            return delta / SCROLL_PIXELS_PER_STEP
+        return delta
+
+    def on_scroll_begin(self, controller):
+        # Touching the touchpad again stops any inertia
+        self._kinetic_velocity = 0.0
 
     def on_scroll(self, controller, dx, dy):
-        if not self.is_running:
+        if not self.core.is_running:
             state = controller.get_current_event_state()
-            is_shift = state & Gdk.ModifierType.SHIFT_MASK if state else False
-
-            # Touchpads send small fractional values for dy, mice send 1.0 or -1.0
-            self.scroll_accumulator += dy
-            
-            # Threshold to trigger a step. 1.0 is a standard mouse wheel click.
-            if abs(self.scroll_accumulator) >= 1.0:
-                # Determine how many "steps" we crossed
-                steps = int(self.scroll_accumulator)
-                self.scroll_accumulator -= steps
-                
-                delta = -steps # Negative because scrolling down (positive dy) should usually decrease time
-                
-                if is_shift:
-                    self.time_seconds += delta * self.scroll_sec_step
-                else:
-                    self.time_seconds += delta * self.scroll_min_step * 60
-                    
-                self.time_seconds = max(0, min(self.time_seconds, 999 * 60))
-                self.initial_time_seconds = self.time_seconds
-                
-                # Disconnect the signal temporarily so we don't trigger on_spin_changed
-                self.min_spin.handler_block_by_func(self.on_spin_changed)
-                self.sec_spin.handler_block_by_func(self.on_spin_changed)
-                
-                self.min_spin.set_value(self.time_seconds // 60)
-                self.sec_spin.set_value(self.time_seconds % 60)
-                
-                self.min_spin.handler_unblock_by_func(self.on_spin_changed)
-                self.sec_spin.handler_unblock_by_func(self.on_spin_changed)
-                
-                self.queue_draw()
+            self._scroll_shift = bool(state & Gdk.ModifierType.SHIFT_MASK) if state else False
+            self._scroll_pending[self._scroll_shift] += self._scroll_steps(controller, dy)
+            self._queue_scroll_frame()
         return True
 
-    def on_click(self, gesture, n_press, x, y):
-        width = self.get_allocated_width()
-        height = self.get_allocated_height()
-        cx, cy = width / 2, height / 2
-        radius = min(width, height) / 2 - 20
-
-        # Define click areas
-        play_y = cy + radius * 0.65
-        play_x = cx
-        
-        reset_x = cx - radius * 0.4
-        reset_y = play_y
-        
-        zero_x = cx + radius * 0.4
-        zero_y = play_y
+    def on_scroll_decelerate(self, controller, vel_x, vel_y):
+        if not self.core.is_running:
+            self._kinetic_velocity = self._scroll_steps(controller, vel_y)
+            self._queue_scroll_frame()
+
+    def _queue_scroll_frame(self):
+        if self._scroll_tick_id is None:
+            self._scroll_frame_time = 0
+            self._scroll_tick_id = self.add_tick_callback(self.on_scroll_frame)
+
+    def on_scroll_frame(self, widget, frame_clock):
+        # Everything scrolled since the last frame is applied as one change,
+        # so the core, the spin buttons and the dial update once per frame
+        now = frame_clock.get_frame_time()
+        if self._kinetic_velocity and self._scroll_frame_time:
+            dt = (now - self._scroll_frame_time) / USEC_PER_SEC
+            self._scroll_pending[self._scroll_shift] += self._kinetic_velocity * dt
+            self._kinetic_velocity *= math.exp(-KINETIC_FRICTION * dt)
+            if abs(self._kinetic_velocity) < KINETIC_MIN_VELOCITY or self.core.is_running:
+                self._kinetic_velocity = 0.0
+        self._scroll_frame_time = now
+
+        for shift in (False, True):
+            pending = self._scroll_pending[shift]
+            self._scroll_pending[shift] = 0.0
+            if pending and not self.core.is_running:
+                self.apply_scroll(pending, shift)
+
+        if self._kinetic_velocity:
+            return GLib.SOURCE_CONTINUE
+        self._scroll_tick_id = None
+        return GLib.SOURCE_REMOVE
+
+    def apply_scroll(self, dy, shift):
+        # Touchpads send small fractional values for dy, mice send 1.0 or -1.0
+        self.scroll_accumulator += dy
+
+        # Threshold to trigger a step. 1.0 is a standard mouse wheel click.
+        if abs(self.scroll_accumulator) < 1.0:
+            return
+        # Determine how many "steps" we crossed
+        steps = int(self.scroll_accumulator)
+        self.scroll_accumulator -= steps
+
+        delta = -steps # Negative because scrolling down (positive dy) should usually decrease time
+
+        if shift:
+            self.core.adjust(delta * self.scroll_sec_step)
+        else:
+            self.core.adjust(delta * self.scroll_min_step * 60)
+
+        # The spin buttons are synced when the popover opens; while it is
+        # hidden there is nothing to update
+        if self.popover.get_visible():
+            # Disconnect the signal temporarily so we don't trigger on_spin_changed
+            self.min_spin.handler_block_by_func(self.on_spin_changed)
+            self.sec_spin.handler_block_by_func(self.on_spin_changed)
 
-        dist_to_play = math.hypot(x - play_x, y - play_y)
-        dist_to_reset = math.hypot(x - reset_x, y - reset_y)
-        dist_to_zero = math.hypot(x - zero_x, y - zero_y)
-        dist_to_center = math.hypot(x - cx, y - cy)
+            self.min_spin.set_value(self.core.time_seconds // 60)
+            self.sec_spin.set_value(self.core.time_seconds % 60)
 
-        if dist_to_center < radius * 0.4:
+            self.min_spin.handler_unblock_by_func(self.on_spin_changed)
+            self.sec_spin.handler_unblock_by_func(self.on_spin_changed)
+
+    def on_click(self, gesture, n_press, x, y):
+        dial = self.get_dial(self.get_width(), self.get_height())
+        region = dial.hit_test(x, y)
+
+        if region == "text":
             # Clicked central text area
-            if not self.is_running:
-                self.min_spin.set_value(self.time_seconds // 60)
-                self.sec_spin.set_value(self.time_seconds % 60)
+            if not self.core.is_running:
+                self.min_spin.set_value(self.core.time_seconds // 60)
+                self.sec_spin.set_value(self.core.time_seconds % 60)
                 rect = Gdk.Rectangle()
-                rect.x = int(cx)
-                rect.y = int(cy)
+                rect.x = int(dial.cx)
+                rect.y = int(dial.cy)
                 rect.width = 1
                 rect.height = 1
                 self.popover.set_pointing_to(rect)
                 self.popover.popup()
-        elif dist_to_play < 40:
+        elif region == "play":
             self.toggle_timer()
-        elif dist_to_reset < 30:
-            if not self.is_running:
-                self.time_seconds = self.config["default_time"] * 60
-                self.initial_time_seconds = self.time_seconds
-                self.queue_draw()
-        elif dist_to_zero < 30:
-            if not self.is_running:
-                self.time_seconds = 0
-                self.initial_time_seconds = 0
-                self.queue_draw()
+        elif region == "reset":
+            self.core.reset(self.config["default_time"] * 60)
+        elif region == "zero":
+            self.core.set_time(0)
+        elif region == "minus":
+            self.core.adjust(-5 * 60)
+        elif region == "plus":
+            self.core.adjust(5 * 60)
         else:
-            if x < cx - radius * 0.5 and y < cy + radius * 0.4:
-                if not self.is_running:
-                    self.time_seconds = max(0, self.time_seconds - 5 * 60)
-                    self.initial_time_seconds = self.time_seconds
-            elif x > cx + radius * 0.5 and y < cy + radius * 0.4:
-                if not self.is_running:
-                    self.time_seconds = min(999 * 60, self.time_seconds + 5 * 60)
-                    self.initial_time_seconds = self.time_seconds
-            else:
-                self.popover.popdown()
-                
-        self.queue_draw()
+            self.popover.popdown()
+
+    def on_motion(self, controller, x, y):
+        region = self.get_dial(self.get_width(), self.get_height()).hit_test(x, y)
+        if region in STOPPED_ONLY_REGIONS and self.core.is_running:
+            region = None
+        self.set_hover(region)
+
+    def on_leave(self, controller):
+        self.set_hover(None)
+
+    def set_hover(self, region):
+        if region == self.hover:
+            return
+        previous, self.hover = self.hover, region
+        self.set_cursor_from_name("pointer" if region else None)
+        if previous in ("play", "reset", "zero") or region in ("play", "reset", "zero"):
+            self.layers["buttons"].queue_draw()
 
     def toggle_timer(self):
         self.popover.popdown()
-        if self.is_running:
-            self.is_running = False
-            if self.timer_source:
-                GLib.source_remove(self.timer_source)
-                self.timer_source = None
-        else:
-            if self.time_seconds > 0:
-                self.initial_time_seconds = self.time_seconds
-                self.is_running = True
-                self.timer_source = GLib.timeout_add(1000, self.tick)
+        self.core.toggle()
 
-    def notify_finish(self):
-        try:
-            # Desktop notification
-            subprocess.Popen(['notify-send', '-i', 'appointment-soon', 'GTKetchup', 'Time is up!'])
-            # Sound notification (Ubuntu/GNOME system sound)
-            subprocess.Popen(['paplay', '/usr/share/sounds/freedesktop/stereo/complete.oga'])
-        except Exception as e:
-            print("Failed to dispatch notification/sound:", e)
-
-    def tick(self):
-        if self.time_seconds > 0:
-            self.time_seconds -= 1
-            self.queue_draw()
-            return True
-        else:
-            self.is_running = False
-            self.timer_source = None
-            self.notify_finish()
-            self.queue_draw()
-            return False
-            
     def _get_color_for_hours(self, hours):
         # White -> Yellow -> Orange -> Red
         if hours == 0:
@@ -217,10 +1004,64 @@ class PomodoroTimer(Gtk.DrawingArea):
         else:
             return (1.0, 0.2, 0.2) # Red
 
+    def _get_static_layer(self, name, painter, width, height, rect, state=None):
+        scale = self.get_scale_factor()
+        key = (name, width, height, scale, state)
+        surface = _static_layer_cache.get(key)
+        if surface is None:
+            self._note_first_use("surface", key)
+            # Surfaces rendered for another size will not be used again
+            for old_key in [k for k in _static_layer_cache if k[1:4] != key[1:4]]:
+                del _static_layer_cache[old_key]
+            x, y, w, h = rect
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, int(math.ceil(w * scale)), int(math.ceil(h * scale)))
+            surface.set_device_scale(scale, scale)
+            scr = cairo.Context(surface)
+            scr.translate(-x, -y)
+            painter(scr, width, height)
+            surface.flush()
+            _static_layer_cache[key] = surface
+        return surface
+
+    def _paint_static(self, cr, name, painter, width, height, rect, state=None):
+        surface = self._get_static_layer(name, painter, width, height, rect, state)
+        cr.set_source_surface(surface, rect[0], rect[1])
+        cr.paint()
+
+    def on_layer_draw(self, area, cr, width, height, name):
+        rect = self._layer_rects.get(name)
+        if rect is None:
+            return
+        cr.translate(-rect.x, -rect.y)
+        self._layer_painters[name](cr, self.get_width(), self.get_height())
+
     def on_draw(self, area, cr, width, height, data=None):
-        cx = width / 2
-        cy = height / 2
-        radius = min(width, height) / 2 - 20
+        # Full repaint of every visible layer into a single context
+        for name in LAYERS:
+            if self.layers[name].get_visible():
+                self._layer_painters[name](cr, width, height)
+
+    def _draw_face(self, cr, width, height):
+        rect = self.get_dial(width, height).layer_rects["face"]
+        self._paint_static(cr, "face", self._render_face, width, height, rect)
+
+    def _get_buttons_state(self):
+        hover = self.hover if self.hover in ("play", "reset", "zero") else None
+        return (self.core.is_running, hover)
+
+    def _get_buttons_layer(self, width, height, state):
+        rect = self.get_dial(width, height).layer_rects["buttons"]
+        painter = lambda cr, width, height: self._render_buttons(cr, width, height, state)
+        return self._get_static_layer("buttons", painter, width, height, rect, state)
+
+    def _draw_buttons(self, cr, width, height):
+        rect = self.get_dial(width, height).layer_rects["buttons"]
+        cr.set_source_surface(self._get_buttons_layer(width, height, self._get_buttons_state()), rect[0], rect[1])
+        cr.paint()
+
+    def _render_face(self, cr, width, height):
+        dial = self.get_dial(width, height)
+        cx, cy, radius = dial.cx, dial.cy, dial.radius
 
         # Background circular dial
         cr.arc(cx, cy, radius, 0, 2 * math.pi)
@@ -240,151 +1081,19 @@ class PomodoroTimer(Gtk.DrawingArea):
         cr.set_source_rgb(0.05, 0.05, 0.05)
         cr.fill()
 
-        num_dots = 60
-        dot_radius = radius - 30
-        
-        minutes = self.time_seconds // 60
-        seconds = self.time_seconds % 60
-        hours = self.time_seconds // 3600
-        
-        active_dots = math.ceil((self.time_seconds % 3600) / 60)
-        if self.time_seconds > 0 and self.time_seconds % 3600 == 0:
-            active_dots = 60
-        
-        if self.is_running and seconds > 0:
-             active_dots = (minutes % 60) + 1
-
-        active_color = self._get_color_for_hours(hours)
-        inactive_color = (0.2, 0.2, 0.2)
-        
-        # luminous dots
-        for i in range(num_dots):
-            angle = -math.pi / 2 + (i * 2 * math.pi / num_dots)
-            dot_x = cx + math.cos(angle) * dot_radius
-            dot_y = cy + math.sin(angle) * dot_radius
-            
-            if i < active_dots or (hours > 0 and self.time_seconds % 3600 == 0):
-                 cr.set_source_rgb(*active_color)
-            else:
-                 cr.set_source_rgb(*inactive_color)
-                
-            cr.arc(dot_x, dot_y, 4, 0, 2 * math.pi)
-            cr.fill()
-
-        hours_view = False
-        if self.time_seconds >= 3600:
-            hours_view = True
-            
-        # Draw Time Text
-        if hours_view:
-            val1 = hours
-            val2 = minutes % 60
-            small_val = seconds
-            
-            # Draw HH:MM large
-            time_str = f"{int(val1):02d}:{int(val2):02d}"
-            layout = self.create_pango_layout(time_str)
-            desc = Pango.FontDescription("Sans Bold 70")
-            layout.set_font_description(desc)
-            
-            PangoCairo.update_layout(cr, layout)
-            text_width, text_height = layout.get_pixel_size()
-            
-            # Draw :SS small
-            sec_str = f":{int(small_val):02d}"
-            sec_layout = self.create_pango_layout(sec_str)
-            sec_desc = Pango.FontDescription("Sans Bold 15")
-            sec_layout.set_font_description(sec_desc)
-            
-            PangoCairo.update_layout(cr, sec_layout)
-            sec_width, sec_height = sec_layout.get_pixel_size()
-            
-            total_width = text_width + sec_width
-            start_x = cx - total_width / 2
-            
-            cr.set_source_rgb(1, 1, 1)
-            cr.move_to(start_x, cy - text_height / 2 + 10)
-            PangoCairo.show_layout(cr, layout)
-            
-            # The smaller seconds are vertically aligned near the baseline of the larger text
-            cr.move_to(start_x + text_width, cy - sec_height / 2 + 10 + (text_height / 2 - sec_height / 2))
-            PangoCairo.show_layout(cr, sec_layout)
-            
-            # Optional small 'H', 'M', 'S' labels below
-            h_layout = self.create_pango_layout("H")
-            m_layout = self.create_pango_layout("M")
-            s_layout = self.create_pango_layout("S")
-            small_desc = Pango.FontDescription("Sans Bold 14")
-            h_layout.set_font_description(small_desc)
-            m_layout.set_font_description(small_desc)
-            s_layout.set_font_description(small_desc)
-            
-            PangoCairo.update_layout(cr, h_layout)
-            PangoCairo.update_layout(cr, m_layout)
-            PangoCairo.update_layout(cr, s_layout)
-            
-            col_width = text_width / 2
-            cr.set_source_rgb(0.7, 0.7, 0.7)
-            
-            hw, _ = h_layout.get_pixel_size()
-            cr.move_to(start_x + col_width / 2 - hw / 2, cy - text_height / 2 - 25)
-            PangoCairo.show_layout(cr, h_layout)
-            
-            mw, _ = m_layout.get_pixel_size()
-            cr.move_to(start_x + col_width + col_width / 2 - mw / 2, cy - text_height / 2 - 25)
-            PangoCairo.show_layout(cr, m_layout)
-
-        else:
-            val1 = minutes
-            val2 = seconds
-            
-            # Center Time Text MM SS
-            time_str = f"{int(val1):02d} {int(val2):02d}"
-            if val1 > 99:
-                time_str = f"{int(val1):03d} {int(val2):02d}"
-                
-            layout = self.create_pango_layout(time_str)
-            desc = Pango.FontDescription("Sans Bold 80")
-            if val1 > 99:
-                desc = Pango.FontDescription("Sans Bold 60")
-                
-            layout.set_font_description(desc)
-            
-            PangoCairo.update_layout(cr, layout)
-            text_width, text_height = layout.get_pixel_size()
-            cr.set_source_rgb(1, 1, 1)
-            cr.move_to(cx - text_width / 2, cy - text_height / 2 + 10)
-            PangoCairo.show_layout(cr, layout)
-
-            # Labels
-            m_layout = self.create_pango_layout("M")
-            s_layout = self.create_pango_layout("S")
-            small_desc = Pango.FontDescription("Sans Bold 16")
-            m_layout.set_font_description(small_desc)
-            s_layout.set_font_description(small_desc)
-            
-            PangoCairo.update_layout(cr, m_layout)
-            PangoCairo.update_layout(cr, s_layout)
-            m_w, m_h = m_layout.get_pixel_size()
-            s_w, s_h = s_layout.get_pixel_size()
-            
-            col_width = text_width / 2
-            cr.set_source_rgb(0.7, 0.7, 0.7)
-            cr.move_to(cx - col_width / 2 - m_w / 2, cy - text_height / 2 - 30)
-            PangoCairo.show_layout(cr, m_layout)
-            
-            cr.move_to(cx + col_width / 2 - s_w / 2, cy - text_height / 2 - 30)
-            PangoCairo.show_layout(cr, s_layout)
+    def _render_buttons(self, cr, width, height, state):
+        dial = self.get_dial(width, height)
+        cx, play_y = dial.play
+        is_running, hover = state
 
         # Play / Pause icon
-        play_y = cy + radius * 0.65
         cr.arc(cx, play_y, 18, 0, 2 * math.pi)
-        cr.set_source_rgb(0.15, 0.15, 0.15)
+        cr.set_source_rgb(*self._get_button_color("play", hover))
         cr.fill()
         
         cr.set_source_rgb(1, 1, 1)
         cr.set_line_width(2)
-        if self.is_running:
+        if is_running:
             cr.rectangle(cx - 5, play_y - 6, 3, 12)
             cr.rectangle(cx + 2, play_y - 6, 3, 12)
             cr.fill()
@@ -400,12 +1109,11 @@ class PomodoroTimer(Gtk.DrawingArea):
         cr.stroke()
 
         # Reset icon (bottom left)
-        if not self.is_running:
-             reset_x = cx - radius * 0.4
-             reset_y = play_y
+        if not is_running:
+             reset_x, reset_y = dial.reset
              
              cr.arc(reset_x, reset_y, 14, 0, 2 * math.pi)
-             cr.set_source_rgb(0.15, 0.15, 0.15)
+             cr.set_source_rgb(*self._get_button_color("reset", hover))
              cr.fill()
              
              cr.set_source_rgb(0.9, 0.9, 0.9)
@@ -419,20 +1127,262 @@ class PomodoroTimer(Gtk.DrawingArea):
              cr.fill()
 
         # Zero icon (bottom right)
-        if not self.is_running:
-             zero_x = cx + radius * 0.4
-             zero_y = play_y
+        if not is_running:
+             zero_x, zero_y = dial.zero
              
              cr.arc(zero_x, zero_y, 14, 0, 2 * math.pi)
-             cr.set_source_rgb(0.15, 0.15, 0.15)
+             cr.set_source_rgb(*self._get_button_color("zero", hover))
              cr.fill()
              
-             z_layout = self.create_pango_layout("0")
-             z_desc = Pango.FontDescription("Sans Bold 12")
-             z_layout.set_font_description(z_desc)
+             z_layout = self._get_layout("Sans Bold 12", "0")
              PangoCairo.update_layout(cr, z_layout)
              z_w, z_h = z_layout.get_pixel_size()
              
              cr.set_source_rgb(0.9, 0.9, 0.9)
              cr.move_to(zero_x - z_w / 2, zero_y - z_h / 2)
              PangoCairo.show_layout(cr, z_layout)
+
+    def _get_button_color(self, region, hover):
+        return (0.25, 0.25, 0.25) if hover == region else (0.15, 0.15, 0.15)
+
+    def _draw_ring(self, cr, width, height):
+        dial = self.get_dial(width, height)
+        cx, cy = dial.cx, dial.cy
+
+        xs, ys = get_dot_geometry(dial.dot_radius)
+
+        # Kept up to date by update_damage(), once per state change
+        if self._ring_state is None:
+            self._ring_state = get_ring_state(self._shown_seconds, self.core.is_running)
+        active_dots, hours = self._ring_state
+
+        active_color = self._get_color_for_hours(hours)
+        inactive_color = (0.2, 0.2, 0.2)
+        
+        # luminous dots: one path and one fill per color
+        cr.save()
+        cr.translate(cx, cy)
+        for color, dots in ((active_color, range(active_dots)), (inactive_color, range(active_dots, NUM_DOTS))):
+            if not dots:
+                continue
+            for i in dots:
+                cr.new_sub_path()
+                cr.arc(xs[i], ys[i], 4, 0, 2 * math.pi)
+            cr.set_source_rgb(*color)
+            cr.fill()
+        cr.restore()
+
+    def _draw_sweep(self, cr, width, height):
+        if self._sweep_angle is None:
+            return
+        x, y = self.get_dial(width, height).sweep_center(self._sweep_angle)
+        active_dots, hours = self._ring_state or get_ring_state(self._shown_seconds, self.core.is_running)
+        cr.arc(x, y, 3, 0, 2 * math.pi)
+        cr.set_source_rgb(*self._get_color_for_hours(hours))
+        cr.fill()
+
+    def _get_digit_ops(self, width, height, measure):
+        # Positions of the countdown text, shared by both renderers. Returns
+        # (kind, font, text, x, y, gray) tuples where kind is "digits" (the
+        # changing time) or "label"; measure(kind, font, text) -> (w, h).
+        dial = self.get_dial(width, height)
+        cx, cy = dial.cx, dial.cy
+
+        minutes = self._shown_seconds // 60
+        seconds = self._shown_seconds % 60
+        hours = self._shown_seconds // 3600
+
+        hours_view = False
+        if self._shown_seconds >= 3600:
+            hours_view = True
+
+        if hours_view:
+            # HH:MM large, :SS small
+            time_str = f"{int(hours):02d}:{int(minutes % 60):02d}"
+            text_width, text_height = measure("digits", "Sans Bold 70", time_str)
+            sec_str = f":{int(seconds):02d}"
+            sec_width, sec_height = measure("digits", "Sans Bold 15", sec_str)
+
+            total_width = text_width + sec_width
+            start_x = cx - total_width / 2
+            # Small 'H' and 'M' labels centered above each half
+            col_width = text_width / 2
+            hw, _ = measure("label", "Sans Bold 14", "H")
+            mw, _ = measure("label", "Sans Bold 14", "M")
+            return [
+                ("digits", "Sans Bold 70", time_str, start_x, cy - text_height / 2 + 10, 1.0),
+                # The smaller seconds are vertically aligned near the baseline of the larger text
+                ("digits", "Sans Bold 15", sec_str, start_x + text_width,
+                 cy - sec_height / 2 + 10 + (text_height / 2 - sec_height / 2), 1.0),
+                ("label", "Sans Bold 14", "H", start_x + col_width / 2 - hw / 2, cy - text_height / 2 - 25, 0.7),
+                ("label", "Sans Bold 14", "M", start_x + col_width + col_width / 2 - mw / 2,
+                 cy - text_height / 2 - 25, 0.7),
+            ]
+
+        # Center Time Text MM SS
+        time_str = f"{int(minutes):02d} {int(seconds):02d}"
+        font = "Sans Bold 80"
+        if minutes > 99:
+            time_str = f"{int(minutes):03d} {int(seconds):02d}"
+            font = "Sans Bold 60"
+        text_width, text_height = measure("digits", font, time_str)
+        m_w, _ = measure("label", "Sans Bold 16", "M")
+        s_w, _ = measure("label", "Sans Bold 16", "S")
+        col_width = text_width / 2
+        return [
+            ("digits", font, time_str, cx - text_width / 2, cy - text_height / 2 + 10, 1.0),
+            ("label", "Sans Bold 16", "M", cx - col_width / 2 - m_w / 2, cy - text_height / 2 - 30, 0.7),
+            ("label", "Sans Bold 16", "S", cx + col_width / 2 - s_w / 2, cy - text_height / 2 - 30, 0.7),
+        ]
+
+    def _draw_digits(self, cr, width, height):
+        def measure(kind, font, text):
+            if kind == "digits":
+                return self._get_digit_text(cr, font, text)[:2]
+            layout = self._get_layout(font, text)
+            PangoCairo.update_layout(cr, layout)
+            return layout.get_pixel_size()
+
+        for kind, font, text, x, y, gray in self._get_digit_ops(width, height, measure):
+            cr.set_source_rgb(gray, gray, gray)
+            if kind == "digits":
+                self._show_digit_text(cr, self._get_digit_text(cr, font, text)[2], text, x, y)
+            else:
+                cr.move_to(x, y)
+                PangoCairo.show_layout(cr, self._get_layout(font, text))
+
+    # Snapshot renderer: the same layers built from GSK render nodes. The
+    # face and ring are color, gradient and border nodes; text is text
+    # nodes, cached per glyph or label; the button icons stay a cached
+    # cairo node. Unchanged layers hand GSK the very same node again.
+
+    def on_layer_snapshot(self, layer, snapshot, name):
+        rect = self._layer_rects.get(name)
+        if rect is None:
+            return
+        snapshot.translate(Graphene.Point().init(-rect.x, -rect.y))
+        self._layer_snapshots[name](snapshot, self.get_width(), self.get_height())
+
+    def snapshot_dial(self, snapshot, width, height):
+        # Every visible layer into one snapshot; the counterpart of on_draw()
+        for name in LAYERS:
+            if self.layers[name].get_visible():
+                self._layer_snapshots[name](snapshot, width, height)
+
+    def _get_static_node(self, key, builder):
+        node = _static_node_cache.get(key)
+        if node is None:
+            self._note_first_use("node", key)
+            # Nodes built for another size will not be used again
+            for old_key in [k for k in _static_node_cache if k[1:3] != key[1:3]]:
+                del _static_node_cache[old_key]
+            snapshot = Gtk.Snapshot()
+            builder(snapshot)
+            node = _static_node_cache[key] = snapshot.to_node()
+        return node
+
+    def _append_node(self, snapshot, node):
+        if node is not None:
+            snapshot.append_node(node)
+
+    def _snapshot_face(self, snapshot, width, height):
+        dial = self.get_dial(width, height)
+        cx, cy, radius = dial.cx, dial.cy, dial.radius
+
+        def build(snapshot):
+            # Background circular dial
+            bounds = _rect(cx - radius, cy - radius, 2 * radius, 2 * radius)
+            stops = []
+            for offset, value in ((0, 0.2), (1, 0.05)):
+                stop = Gsk.ColorStop()
+                stop.offset = offset
+                stop.color = _rgba(value, value, value)
+                stops.append(stop)
+            snapshot.push_rounded_clip(_circle(cx, cy, radius))
+            snapshot.append_linear_gradient(bounds, Graphene.Point().init(cx - radius, cy - radius),
+                                            Graphene.Point().init(cx + radius, cy + radius), stops)
+            snapshot.pop()
+            # Dial border, centered on the edge like the cairo stroke
+            border = _rgba(0.6, 0.6, 0.6)
+            snapshot.append_border(_circle(cx, cy, radius + 4), [8, 8, 8, 8], [border] * 4)
+            # Inner dark face
+            _append_circle(snapshot, cx, cy, radius - 8, _rgba(0.05, 0.05, 0.05))
+
+        self._append_node(snapshot, self._get_static_node(("face", width, height, None), build))
+
+    def _snapshot_buttons(self, snapshot, width, height, state=None):
+        rect = self.get_dial(width, height).layer_rects["buttons"]
+        state = state or self._get_buttons_state()
+
+        def build(snapshot):
+            cr = snapshot.append_cairo(_rect(*rect))
+            self._render_buttons(cr, width, height, state)
+
+        key = ("buttons", width, height, state)
+        self._append_node(snapshot, self._get_static_node(key, build))
+
+    def _snapshot_ring(self, snapshot, width, height):
+        dial = self.get_dial(width, height)
+        if self._ring_state is None:
+            self._ring_state = get_ring_state(self._shown_seconds, self.core.is_running)
+        key = (width, height, self._ring_state)
+        if self._ring_node is None or self._ring_node[0] != key:
+            # Rebuilt when a dot changes, about once a minute
+            active_dots, hours = self._ring_state
+            colors = (_rgba(*self._get_color_for_hours(hours)), _rgba(0.2, 0.2, 0.2))
+            xs, ys = get_dot_geometry(dial.dot_radius)
+            ring = Gtk.Snapshot()
+            for i in range(NUM_DOTS):
+                _append_circle(ring, dial.cx + xs[i], dial.cy + ys[i], 4, colors[i >= active_dots])
+            self._ring_node = (key, ring.to_node())
+        self._append_node(snapshot, self._ring_node[1])
+
+    def _snapshot_sweep(self, snapshot, width, height):
+        if self._sweep_angle is None:
+            return
+        x, y = self.get_dial(width, height).sweep_center(self._sweep_angle)
+        active_dots, hours = self._ring_state or get_ring_state(self._shown_seconds, self.core.is_running)
+        _append_circle(snapshot, x, y, 3, _rgba(*self._get_color_for_hours(hours)))
+
+    def _get_text_node(self, font, text, gray):
+        key = (font, text, gray)
+        node = _text_node_cache.get(key)
+        if node is None:
+            self._note_first_use("text node", key)
+            snapshot = Gtk.Snapshot()
+            snapshot.append_layout(self._get_layout(font, text), _rgba(gray, gray, gray))
+            node = _text_node_cache[key] = snapshot.to_node()
+        return node
+
+    def _snapshot_digits(self, snapshot, width, height):
+        def measure(kind, font, text):
+            if kind == "digits" and self.use_digit_atlas:
+                atlas = self._get_digit_atlas(font, 1)
+                if atlas.covers(text):
+                    return atlas.get_pixel_size(text)
+            if kind == "digits":
+                return self._get_text_layout(font, text).get_pixel_size()
+            return self._get_layout(font, text).get_pixel_size()
+
+        for kind, font, text, x, y, gray in self._get_digit_ops(width, height, measure):
+            atlas = self._get_digit_atlas(font, 1) if kind == "digits" and self.use_digit_atlas else None
+            if atlas is not None and atlas.covers(text):
+                # One cached node per glyph, placed on the fixed advances
+                for ch in text:
+                    if ch != " ":
+                        snapshot.save()
+                        snapshot.translate(Graphene.Point().init(x + atlas.insets[ch], y))
+                        self._append_node(snapshot, self._get_text_node(font, ch, gray))
+                        snapshot.restore()
+                    x += atlas.advances[ch]
+            elif kind == "label":
+                snapshot.save()
+                snapshot.translate(Graphene.Point().init(x, y))
+                self._append_node(snapshot, self._get_text_node(font, text, gray))
+                snapshot.restore()
+            else:
+                # Text the atlas cannot draw changes every second; not cached
+                snapshot.save()
+                snapshot.translate(Graphene.Point().init(x, y))
+                snapshot.append_layout(self._get_text_layout(font, text), _rgba(gray, gray, gray))
+                snapshot.restore()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timer_core import ManualClock  # noqa: E402
+
+
+@pytest.fixture
+def clock():
+    clock = ManualClock()
+    yield clock
+    # Every countdown is over or paused, so nothing may still be armed
+    assert clock.pending_sources() == 0, f"{clock.pending_sources()} clock sources left"
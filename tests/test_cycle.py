@@ -0,0 +1,118 @@
+import pytest
+
+from cycle import DictConfig, PomodoroCycle
+from timer_core import LONG_BREAK, RESUME_CHECK_US, SHORT_BREAK, USEC_PER_SEC, WORK, TimerCore
+
+SLACK = 0.01
+
+CONFIG = {
+    "default_time": 25,
+    "short_break": 5,
+    "long_break": 15,
+    "cycles_before_long_break": 4,
+    "cycle_enabled": True,
+}
+
+
+@pytest.fixture
+def config():
+    return DictConfig(CONFIG)
+
+
+@pytest.fixture
+def core(clock):
+    core = TimerCore(25 * 60, clock=clock)
+    core.phases = []
+    core.connect("state-changed", lambda core: core.is_running and core.phases.append((core.phase, core.deadline)))
+    core.set_ticking(False)
+    yield core
+    core.pause()
+
+
+@pytest.fixture
+def cycle(core, config):
+    cycle = PomodoroCycle(core, config)
+    yield cycle
+    cycle.disconnect()
+
+
+def test_chain(core, cycle):
+    core.start()
+    core.clock.advance(4 * 25 * 60 + 3 * 5 * 60 + 15 * 60 + SLACK)
+    expected = [WORK, SHORT_BREAK, WORK, SHORT_BREAK, WORK, SHORT_BREAK, WORK, LONG_BREAK, WORK]
+    assert [phase for phase, _ in core.phases] == expected
+    # Every phase ends exactly its length after the previous planned
+    # deadline, however late the wakeup that started it ran
+    deadline = 0
+    for phase, planned in core.phases:
+        deadline += cycle.phase_seconds(phase) * USEC_PER_SEC
+        assert planned == deadline, phase
+    assert core.clock.wakeups <= len(expected) + core.clock.now // RESUME_CHECK_US
+    assert cycle.completed == 4
+
+
+def test_suspend_during_work(core, cycle):
+    core.start()
+    core.clock.advance(10 * 60)
+    core.clock.suspend(3600)
+    core.clock.advance(RESUME_CHECK_US / USEC_PER_SEC + SLACK)
+    # 71 minutes in on the wall clock: work, break, work and break are
+    # over, the third work session has 15 minutes left
+    assert core.is_running and core.phase == WORK
+    assert cycle.completed == 2
+    assert core.get_remaining(core.clock.now) == 14 * 60
+    assert [phase for phase, _ in core.phases] == [WORK, WORK]
+
+
+def test_suspend_past_whole_day(core, cycle):
+    core.start()
+    core.clock.suspend(2 * 24 * 3600)
+    core.clock.advance(RESUME_CHECK_US / USEC_PER_SEC + SLACK)
+    # Nothing left of the planned day: back to a stopped work session
+    assert not core.is_running and core.phase == WORK
+    assert core.time_seconds == 25 * 60
+    assert not cycle.schedule
+
+
+def test_reset_starts_over(core, cycle):
+    core.start()
+    core.clock.advance(25 * 60 + 60 + SLACK)
+    assert core.phase == SHORT_BREAK and cycle.completed == 1
+    core.pause()
+    assert core.reset(25 * 60)
+    assert core.phase == WORK and core.time_seconds == 25 * 60
+    assert cycle.completed == 0 and not cycle.schedule
+
+
+def test_disabled(core, clock):
+    cycle = PomodoroCycle(core, DictConfig(CONFIG, cycle_enabled=False))
+    core.start()
+    clock.advance(25 * 60 + SLACK)
+    assert not core.is_running and core.phase == WORK
+    assert not cycle.schedule
+    cycle.disconnect()
+
+
+def test_enabled_during_session(core, clock, config):
+    config["cycle_enabled"] = False
+    cycle = PomodoroCycle(core, config)
+    core.start()
+    clock.advance(10 * 60)
+    config["cycle_enabled"] = True
+    clock.advance(15 * 60 + SLACK)
+    assert core.is_running and core.phase == SHORT_BREAK
+    assert cycle.completed == 1
+    cycle.disconnect()
+
+
+def test_lengths_changed_during_session(core, cycle, config):
+    core.start()
+    core.clock.advance(10 * 60)
+    config["short_break"] = 10
+    core.clock.advance(15 * 60 + SLACK)
+    assert core.phase == SHORT_BREAK
+    assert core.get_remaining(core.clock.now) == 10 * 60
+    config["cycle_enabled"] = False
+    core.clock.advance(10 * 60 + SLACK)
+    assert not core.is_running and core.phase == WORK
+    assert not cycle.schedule
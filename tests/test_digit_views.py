@@ -0,0 +1,35 @@
+import pytest
+
+from timer_core import MAX_SECONDS, ManualClock, TimerCore
+
+gi = pytest.importorskip("gi")
+
+
+@pytest.fixture
+def timer():
+    try:
+        gi.require_version('Gtk', '4.0')
+        from gi.repository import Gtk
+    except (ImportError, ValueError) as e:
+        pytest.skip(str(e))
+    from config import ConfigStore
+    from pomodoro import PomodoroTimer
+    if not Gtk.init_check():
+        pytest.skip("no display")
+    return PomodoroTimer(ConfigStore(), TimerCore(0, clock=ManualClock()))
+
+
+@pytest.mark.parametrize("seconds, texts", [
+    (0, ["00 00", "M", "S"]),
+    (99 * 60 + 59, ["99 59", "M", "S"]),
+    (100 * 60, ["100 00", "M", "S"]),
+    (3599, ["59 59", "M", "S"]),
+    (3600, ["01:00", ":00", "H", "M"]),
+    (3661, ["01:01", ":01", "H", "M"]),
+    (MAX_SECONDS, ["16:39", ":00", "H", "M"]),
+])
+def test_digit_views(timer, seconds, texts):
+    measure = lambda kind, font, text: (len(text) * 10, 10)
+    timer._shown_seconds = seconds
+    ops = timer._get_digit_ops(400, 400, measure)
+    assert [op[2] for op in ops] == texts
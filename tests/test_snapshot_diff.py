@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+gi = pytest.importorskip("gi")
+cairo = pytest.importorskip("cairo")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+# Antialiasing of circles and glyph placement differ slightly between the
+# two renderers; anything beyond a few edge pixels is a real mismatch
+TOLERANCE = 32
+MAX_SHARE = 0.005
+
+
+@pytest.fixture(scope="module")
+def render_states():
+    try:
+        gi.require_version('Gtk', '4.0')
+        from gi.repository import Gtk
+    except (ImportError, ValueError) as e:
+        pytest.skip(str(e))
+    if not Gtk.init_check():
+        pytest.skip("no display")
+    import render
+    return render
+
+
+def paint(draw, size):
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, size, size)
+    draw(cairo.Context(surface))
+    surface.flush()
+    return bytes(surface.get_data())
+
+
+def differing_share(a, b):
+    differing = 0
+    for i in range(0, len(a), 4):
+        if max(abs(a[i + c] - b[i + c]) for c in range(4)) > TOLERANCE:
+            differing += 1
+    return differing / (len(a) // 4)
+
+
+@pytest.mark.parametrize("size", [200, 400])
+def test_snapshot_matches_cairo(render_states, size):
+    from gi.repository import Gtk
+
+    for label, seconds, running in render_states.STATES:
+        timer = render_states.make_timer(seconds, running)
+        reference = paint(lambda cr: timer.on_draw(None, cr, size, size), size)
+
+        def draw_nodes(cr):
+            snapshot = Gtk.Snapshot()
+            timer.snapshot_dial(snapshot, size, size)
+            node = snapshot.to_node()
+            if node is not None:
+                node.draw(cr)
+
+        assert differing_share(reference, paint(draw_nodes, size)) <= MAX_SHARE, label
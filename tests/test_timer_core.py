@@ -0,0 +1,233 @@
+import pytest
+
+from timer_core import (MAX_SECONDS, RESUME_CHECK_US, SHORT_BREAK, USEC_PER_SEC, WORK, TickScheduler,
+                        TimerCore, get_ring_state, parse_duration)
+
+# The scheduler wakes up 1 ms after each whole second (timeouts are rounded
+# up), so advancing by a whole number of seconds needs this much slack
+SLACK = 0.01
+
+
+@pytest.fixture
+def make_core(clock):
+    def make_core(seconds):
+        core = TimerCore(seconds, clock=clock)
+        core.events = []
+        for signal in TimerCore.SIGNALS:
+            core.connect(signal, lambda core, signal=signal: core.events.append((signal, core.time_seconds)))
+        return core
+    return make_core
+
+
+def test_countdown(make_core):
+    core = make_core(3)
+    assert core.start()
+    core.clock.advance(0.5)
+    # Rounded up: the full 3 s still show until a whole second has passed
+    assert core.time_seconds == 3
+    core.clock.advance(0.5 + SLACK)
+    assert core.time_seconds == 2
+    core.clock.advance(2)
+    assert not core.is_running and core.time_seconds == 0
+    assert core.events == [("state-changed", 3), ("changed", 2), ("changed", 1),
+                           ("changed", 0), ("state-changed", 0), ("finished", 0)]
+    # One wakeup per second, the last one right at the deadline
+    assert core.deadline == 3 * USEC_PER_SEC
+    assert core.clock.wakeups == 3
+
+
+def test_long_countdown(make_core):
+    # Three simulated hours, one changed signal per second
+    core = make_core(3 * 3600)
+    core.start()
+    core.clock.advance(3 * 3600 + SLACK)
+    changes = [seconds for signal, seconds in core.events if signal == "changed"]
+    assert changes == list(range(3 * 3600 - 1, -1, -1))
+    assert [signal for signal, _ in core.events].count("finished") == 1
+
+
+def test_hidden_countdown(make_core):
+    core = make_core(3600)
+    core.set_ticking(False)
+    core.start()
+    core.clock.advance(3599)
+    # Nothing shown, nothing emitted, but the remaining time stays exact
+    assert core.time_seconds == 3600
+    assert core.get_remaining(core.clock.now) == 1
+    core.clock.advance(1 + SLACK)
+    # Only the resume checks and the deadline wake it up
+    assert core.events[-1] == ("finished", 0)
+    assert core.clock.wakeups == 3600 * USEC_PER_SEC // RESUME_CHECK_US
+
+
+def test_toggle_pause_resume(make_core):
+    core = make_core(100)
+    assert core.toggle() and core.is_running
+    core.clock.advance(30.4)
+    assert core.toggle() and not core.is_running
+    # Pausing rounds the remaining 69.6 s up, as displayed
+    assert core.time_seconds == 70 and core.initial_time_seconds == 100
+    core.clock.advance(3600)
+    assert core.time_seconds == 70, "a paused timer must not count down"
+    assert core.toggle()
+    assert core.initial_time_seconds == 70
+    core.clock.advance(69.9)
+    assert core.is_running and core.time_seconds == 1
+    core.clock.advance(0.1 + SLACK)
+    assert not core.is_running and core.events[-1] == ("finished", 0)
+    # Starting or pausing twice is a no-op
+    assert not core.pause() and not core.start()
+
+
+def test_set_time_and_zero(make_core):
+    core = make_core(25 * 60)
+    core.start()
+    core.clock.advance(90)
+    assert not core.set_time(10), "set_time must not change a running timer"
+    core.pause()
+    assert core.set_time(25 * 60) and core.time_seconds == core.initial_time_seconds == 25 * 60
+    assert not core.set_time(25 * 60), "setting the same time is not a change"
+    # Zero: nothing to start
+    assert core.set_time(0) and core.time_seconds == 0
+    assert not core.start() and not core.is_running
+    assert not core.adjust(-60) and core.time_seconds == 0
+
+
+def test_reset(make_core):
+    core = make_core(25 * 60)
+    core.start()
+    core.clock.advance(90)
+    assert not core.reset(25 * 60), "a running timer is not reset"
+    core.pause()
+    core.phase = SHORT_BREAK
+    assert core.reset(25 * 60)
+    assert core.phase == WORK and core.time_seconds == 25 * 60
+    assert core.events[-1] == ("reset", 25 * 60)
+
+
+def test_clamp(make_core):
+    core = make_core(10 ** 6)
+    assert core.time_seconds == MAX_SECONDS == 999 * 60
+    assert not core.adjust(60) and core.time_seconds == MAX_SECONDS
+    core.set_time(998 * 60 + 30)
+    assert core.adjust(5 * 60) and core.time_seconds == MAX_SECONDS
+    assert core.adjust(-MAX_SECONDS - 1) and core.time_seconds == 0
+    assert parse_duration("999:00") == MAX_SECONDS
+    assert parse_duration("16:39:00") == MAX_SECONDS
+    core.set_time(parse_duration("17:00:00"))
+    assert core.time_seconds == MAX_SECONDS
+    core.start()
+    core.clock.advance(MAX_SECONDS + SLACK)
+    assert core.events[-1] == ("finished", 0)
+
+
+@pytest.mark.parametrize("seconds, running, state", [
+    (0, False, (0, 0)),
+    (59, True, (1, 0)),
+    (60, False, (1, 0)),
+    (60, True, (1, 0)),
+    (61, True, (2, 0)),
+    (3599, False, (60, 0)),
+    (3599, True, (60, 0)),
+    # A whole hour shows a full ring in the colour of that hour
+    (3600, False, (60, 1)),
+    (3600, True, (60, 1)),
+    (3601, False, (1, 1)),
+    (3601, True, (1, 1)),
+    (3660, False, (1, 1)),
+    (7199, True, (60, 1)),
+    (7200, True, (60, 2)),
+    (7201, True, (1, 2)),
+    (MAX_SECONDS, False, (39, 16)),
+])
+def test_ring_state(seconds, running, state):
+    assert get_ring_state(seconds, running) == state
+
+
+def test_ring_state_countdown():
+    # Counting down only ever adds dots when the ring fills up at a whole hour
+    previous = get_ring_state(MAX_SECONDS, True)
+    for seconds in range(MAX_SECONDS - 1, -1, -1):
+        state = get_ring_state(seconds, True)
+        assert 0 <= state[0] <= 60 and state[1] == seconds // 3600
+        assert state[0] <= previous[0] or seconds % 3600 == 0, (seconds, previous, state)
+        previous = state
+
+
+def test_suspend(make_core):
+    core = make_core(600)
+    core.start()
+    core.clock.advance(10)
+    core.clock.suspend(300)
+    core.clock.advance(1 + SLACK)
+    # The five minutes asleep count as elapsed
+    assert core.time_seconds == 600 - 311
+    core.clock.suspend(3600)
+    core.clock.advance(1)
+    assert not core.is_running and core.events[-1] == ("finished", 0)
+
+
+def test_suspend_while_hidden(make_core):
+    core = make_core(25 * 60)
+    finished_at = []
+    core.connect("finished", lambda core: finished_at.append(core.clock.real))
+    core.set_ticking(False)
+    core.start()
+    core.clock.advance(5 * 60)
+    core.clock.suspend(10 * 60)
+    # The next resume check catches up, so the timer still ends on time
+    core.clock.advance(10 * 60 + SLACK)
+    assert not core.is_running and core.events[-1] == ("finished", 0)
+    assert len(finished_at) == 1
+    assert 0 <= finished_at[0] - 25 * 60 * USEC_PER_SEC <= SLACK * USEC_PER_SEC
+
+
+def test_wall_clock_step(make_core):
+    core = make_core(25 * 60)
+    core.set_ticking(False)
+    core.start()
+    core.clock.advance(60)
+    # An NTP step or date change is not time spent asleep
+    core.clock.step_wall_clock(3600)
+    core.clock.advance(2 * 60)
+    assert core.is_running
+    assert core.get_remaining(core.clock.now) == 22 * 60
+    core.clock.advance(22 * 60 + SLACK)
+    assert not core.is_running and core.events[-1] == ("finished", 0)
+
+
+def test_shared_scheduler(clock):
+    scheduler = TickScheduler(clock)
+    cores = [TimerCore(seconds, scheduler=scheduler) for seconds in (5, 10, 3600)]
+    for core in cores:
+        core.start()
+        clock.advance(0.3)
+        assert clock.pending_sources() == 1
+    clock.advance(20)
+    assert [core.is_running for core in cores] == [False, False, True]
+    assert scheduler.timers == {cores[2]}
+    cores[2].pause()
+    assert scheduler.timers == set() and scheduler.source is None
+
+
+def test_pause_right_after_suspend(make_core):
+    core = make_core(25 * 60)
+    core.set_ticking(False)
+    core.start()
+    core.clock.advance(5 * 60)
+    core.clock.suspend(10 * 60)
+    # Paused before the next resume check ran
+    core.scheduler.catch_up()
+    assert core.get_remaining(core.clock.now) == 10 * 60
+    assert core.pause()
+    assert core.time_seconds == 10 * 60
+
+
+def test_pause_after_sleeping_past_deadline(make_core):
+    core = make_core(5 * 60)
+    core.set_ticking(False)
+    core.start()
+    core.clock.advance(1)
+    core.clock.suspend(3600)
+    assert not core.pause()
+    assert not core.is_running and core.events[-1] == ("finished", 0)
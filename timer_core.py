@@ -0,0 +1,370 @@
+import math
+import time
+
+USEC_PER_SEC = 1000000
+MAX_SECONDS = 999 * 60
+
+# CLOCK_MONOTONIC stops while the machine is suspended, CLOCK_BOOTTIME does
+# not. When the boot time advanced this much more than the monotonic clock
+# between two wakeups, the difference is treated as time spent asleep. (The
+# wall clock is no good for this: NTP or the user can step it.)
+SUSPEND_THRESHOLD_US = 2 * USEC_PER_SEC
+
+# Monotonic timeouts do not fire during suspend and resume with the time
+# asleep still ahead of them, so without the 1 Hz grid a wakeup at least
+# this often notices a resume and catches up on the time slept
+RESUME_CHECK_US = 60 * USEC_PER_SEC
+
+# Phases of a Pomodoro cycle (see cycle.py); a plain timer stays in WORK
+WORK = "work"
+SHORT_BREAK = "short-break"
+LONG_BREAK = "long-break"
+
+
+_CLOCK_BOOTTIME = getattr(time, "CLOCK_BOOTTIME", None)
+
+
+class GLibClock:
+    def __init__(self):
+        # Imported here so the core itself never pulls in gi
+        from gi.repository import GLib
+        self._glib = GLib
+
+    def monotonic_time(self):
+        return self._glib.get_monotonic_time()
+
+    def real_time(self):
+        return self._glib.get_real_time()
+
+    def boot_time(self):
+        if _CLOCK_BOOTTIME is None:
+            # Without CLOCK_BOOTTIME suspend is simply not detected
+            return self._glib.get_monotonic_time()
+        return time.clock_gettime_ns(_CLOCK_BOOTTIME) // 1000
+
+    def timeout_add(self, interval_ms, callback):
+        return self._glib.timeout_add(interval_ms, callback)
+
+    def source_remove(self, source_id):
+        self._glib.source_remove(source_id)
+
+
+class ManualClock:
+    """Simulated clock: time only moves when advance() is called."""
+
+    def __init__(self, start_us=0):
+        self.now = start_us
+        self.real = start_us
+        self.boot = start_us
+        self.wakeups = 0
+        self._sources = {}
+        self._next_id = 1
+
+    def monotonic_time(self):
+        return self.now
+
+    def real_time(self):
+        return self.real
+
+    def boot_time(self):
+        return self.boot
+
+    def timeout_add(self, interval_ms, callback):
+        source_id = self._next_id
+        self._next_id += 1
+        self._sources[source_id] = (self.now + interval_ms * 1000, interval_ms, callback)
+        return source_id
+
+    def source_remove(self, source_id):
+        del self._sources[source_id]
+
+    def pending_sources(self):
+        return len(self._sources)
+
+    def advance(self, seconds):
+        target = self.now + int(seconds * USEC_PER_SEC)
+        while self._sources:
+            source_id, (due, interval_ms, callback) = min(self._sources.items(), key=lambda item: item[1][0])
+            if due > target:
+                break
+            self.real += due - self.now
+            self.boot += due - self.now
+            self.now = due
+            self.wakeups += 1
+            if callback():
+                if source_id in self._sources:
+                    self._sources[source_id] = (self.now + interval_ms * 1000, interval_ms, callback)
+            else:
+                self._sources.pop(source_id, None)
+        self.real += target - self.now
+        self.boot += target - self.now
+        self.now = target
+
+    def suspend(self, seconds):
+        # The monotonic clock stops while suspended, like CLOCK_MONOTONIC
+        self.real += int(seconds * USEC_PER_SEC)
+        self.boot += int(seconds * USEC_PER_SEC)
+
+    def step_wall_clock(self, seconds):
+        # An NTP step or a manual date change; only the wall clock moves
+        self.real += int(seconds * USEC_PER_SEC)
+
+
+class TickScheduler:
+    """Drives any number of running TimerCores from a single clock source.
+
+    All running timers share one 1 Hz wakeup grid (phased on the first timer
+    started), plus an exact wakeup for the earliest deadline so no timer
+    finishes late. Stopped timers are not tracked and cost nothing, and
+    timers that nobody is watching (``ticking`` is False) only need their
+    deadline wakeup, so with all of them hidden the grid is not armed at all;
+    only a coarse check every RESUME_CHECK_US remains, to notice a suspend.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or GLibClock()
+        self.timers = set()
+        self.source = None
+        self.wakeups = 0
+        self._phase = 0
+        self._dispatching = False
+        self._last_monotonic = 0
+        self._last_boot = 0
+
+    def add(self, core):
+        now = self.clock.monotonic_time()
+        self._catch_up_suspend(now)
+        if not self.timers:
+            self._phase = core.deadline
+        self.timers.add(core)
+        self._reschedule(now)
+
+    def remove(self, core):
+        self.timers.discard(core)
+        self._reschedule(self.clock.monotonic_time())
+
+    def refresh(self):
+        self._reschedule(self.clock.monotonic_time())
+
+    def catch_up(self):
+        # Wakeups may be up to RESUME_CHECK_US apart, so anything reading a
+        # deadline outside of one has to account for a suspend first
+        now = self.clock.monotonic_time()
+        if self._catch_up_suspend(now):
+            self._reschedule(now)
+
+    def _catch_up_suspend(self, now):
+        boot_now = self.clock.boot_time()
+        slept = 0
+        if self.timers:
+            slept = (boot_now - self._last_boot) - (now - self._last_monotonic)
+            if slept > SUSPEND_THRESHOLD_US:
+                for core in self.timers:
+                    core.deadline -= slept
+        self._last_monotonic = now
+        self._last_boot = boot_now
+        return slept > SUSPEND_THRESHOLD_US
+
+    def _reschedule(self, now):
+        if self._dispatching:
+            return
+        if self.source:
+            self.clock.source_remove(self.source)
+            self.source = None
+        if not self.timers:
+            return
+        # Next whole second on the shared grid, or an earlier deadline
+        target = min(core.deadline for core in self.timers)
+        if any(core.ticking for core in self.timers):
+            target = min(target, now + ((self._phase - now) % USEC_PER_SEC or USEC_PER_SEC))
+        else:
+            target = min(target, now + RESUME_CHECK_US)
+        self.source = self.clock.timeout_add(max(0, target - now) // 1000 + 1, self._on_timeout)
+
+    def _on_timeout(self):
+        self.source = None
+        self.wakeups += 1
+        now = self.clock.monotonic_time()
+        self._catch_up_suspend(now)
+        self._dispatching = True
+        try:
+            for core in list(self.timers):
+                if core.ticking or core.deadline <= now:
+                    core.update(now)
+        finally:
+            self._dispatching = False
+        self._reschedule(now)
+        # Every wakeup arms its own one-shot source
+        return False
+
+
+class TimerCore:
+    """Countdown state machine, independent of any toolkit.
+
+    Signals (connect with ``connect(name, callback, *args)``; callbacks
+    receive the core as first argument):
+
+    - ``changed``: the remaining or initial time changed
+    - ``state-changed``: the timer started or stopped
+    - ``finished``: the countdown reached zero
+    - ``reset``: the timer was reset to the start of a work session
+
+    While ``ticking`` is False a running timer does not emit ``changed``
+    every second and ``time_seconds`` goes stale; ``get_remaining()`` and
+    the ``finished`` signal stay exact (within RESUME_CHECK_US after a
+    suspend).
+    """
+
+    SIGNALS = ("changed", "state-changed", "finished", "reset")
+
+    def __init__(self, seconds=0, clock=None, scheduler=None):
+        # Timers that share a scheduler share its single wakeup source
+        self.scheduler = scheduler or TickScheduler(clock)
+        self.clock = self.scheduler.clock
+        self.time_seconds = max(0, min(seconds, MAX_SECONDS))
+        self.initial_time_seconds = self.time_seconds
+        self.is_running = False
+        self.deadline = 0
+        self.ticking = True
+        self.phase = WORK
+        self._handlers = {name: {} for name in self.SIGNALS}
+        self._next_handler_id = 1
+
+    def connect(self, signal, callback, *args):
+        handler_id = self._next_handler_id
+        self._next_handler_id += 1
+        self._handlers[signal][handler_id] = (callback, args)
+        return handler_id
+
+    def disconnect(self, handler_id):
+        for handlers in self._handlers.values():
+            handlers.pop(handler_id, None)
+
+    def _emit(self, signal):
+        for callback, args in list(self._handlers[signal].values()):
+            callback(self, *args)
+
+    def set_time(self, seconds):
+        if self.is_running:
+            return False
+        seconds = max(0, min(seconds, MAX_SECONDS))
+        if seconds == self.time_seconds and seconds == self.initial_time_seconds:
+            return False
+        self.time_seconds = seconds
+        self.initial_time_seconds = seconds
+        self._emit("changed")
+        return True
+
+    def reset(self, seconds):
+        # Back to a fresh work session of ``seconds``, leaving any break or
+        # cycle behind; a running timer has to be paused first
+        if self.is_running:
+            return False
+        self.phase = WORK
+        self.set_time(seconds)
+        self._emit("reset")
+        return True
+
+    def adjust(self, delta_seconds):
+        return self.set_time(self.time_seconds + delta_seconds)
+
+    def start(self, deadline=None):
+        # An explicit deadline lets chained phases start from the previous
+        # planned deadline instead of from whenever its wakeup ran
+        if self.is_running:
+            return False
+        now = self.clock.monotonic_time()
+        if deadline is None:
+            deadline = now + self.time_seconds * USEC_PER_SEC
+        else:
+            self.time_seconds = max(0, -((now - deadline) // USEC_PER_SEC))
+        if self.time_seconds <= 0:
+            return False
+        self.initial_time_seconds = self.time_seconds
+        self.is_running = True
+        self.deadline = deadline
+        self.scheduler.add(self)
+        self._emit("state-changed")
+        return True
+
+    def pause(self):
+        if not self.is_running:
+            return False
+        self.scheduler.catch_up()
+        now = self.clock.monotonic_time()
+        # It may have run out while the machine was asleep
+        self.update(now)
+        if not self.is_running:
+            return False
+        self.time_seconds = self.get_remaining(now)
+        self.is_running = False
+        self.scheduler.remove(self)
+        self._emit("state-changed")
+        self._emit("changed")
+        return True
+
+    def toggle(self):
+        if self.is_running:
+            return self.pause()
+        return self.start()
+
+    def set_ticking(self, ticking):
+        if ticking == self.ticking:
+            return
+        self.ticking = ticking
+        if self.is_running:
+            if ticking:
+                # Catch up on the seconds that passed unseen
+                self.scheduler.catch_up()
+                self.update(self.clock.monotonic_time())
+            if self.is_running:
+                self.scheduler.refresh()
+
+    def get_remaining(self, now):
+        # Outside of a wakeup, call scheduler.catch_up() first so time spent
+        # suspended is not counted as remaining
+        if not self.is_running:
+            return self.time_seconds
+        # Rounded up, so the display reads 25:00 until a full second has passed
+        return max(0, -((now - self.deadline) // USEC_PER_SEC))
+
+    def update(self, now):
+        remaining = self.get_remaining(now)
+        if remaining > 0:
+            if remaining != self.time_seconds:
+                self.time_seconds = remaining
+                self._emit("changed")
+        else:
+            self.time_seconds = 0
+            self.is_running = False
+            self.scheduler.remove(self)
+            self._emit("changed")
+            self._emit("state-changed")
+            self._emit("finished")
+
+
+def get_ring_state(time_seconds, is_running):
+    # Returns (active dots out of 60, completed hours) for the dial ring
+    minutes = time_seconds // 60
+    seconds = time_seconds % 60
+    hours = time_seconds // 3600
+
+    active_dots = math.ceil((time_seconds % 3600) / 60)
+    if time_seconds > 0 and time_seconds % 3600 == 0:
+        active_dots = 60
+
+    if is_running and seconds > 0:
+        active_dots = (minutes % 60) + 1
+
+    return active_dots, hours
+
+
+def parse_duration(text):
+    # "90" is seconds; "25:00" is MM:SS and "1:30:00" is HH:MM:SS
+    parts = text.strip().split(":")
+    if not 1 <= len(parts) <= 3 or not all(part.isdigit() for part in parts):
+        raise ValueError(f"invalid duration: {text!r}")
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + int(part)
+    return seconds